@@ -0,0 +1,212 @@
+"""In 6_coupling.py the Order depends on the NotificationService abstraction, which is good for coupling.
+But send_notification is SYNCHRONOUS: Order.create() has to wait until the email or SMS is delivered.
+With a real mail relay or SMS provider that can take hundreds of milliseconds, and one slow provider blocks everything.
+
+With asyncio we can keep the same abstraction but make sending ASYNCHRONOUS:
+- send_notification is a coroutine (async def), so while one message waits for the network, others are sent
+- send_many sends a whole batch concurrently, with a limit on how many are in flight at the same time (a semaphore)
+- every attempt gets a timeout, failed attempts are retried after a random ("jittered") exponential backoff,
+  so many clients that fail at the same moment do not all retry at the same moment again
+- the old synchronous services keep working through an ADAPTER that runs them in a worker thread
+"""
+
+import asyncio
+import random
+import time
+import weakref
+from abc import ABC, abstractmethod
+
+
+# The synchronous abstraction from 6_coupling.py
+class NotificationService(ABC):
+    @abstractmethod
+    def send_notification(self, message: str):
+        pass
+
+
+class EmailService(NotificationService):
+    def send_notification(self, message: str):
+        print(f"Sending email with message: {message}")
+
+
+class SMSService(NotificationService):
+    def send_notification(self, message: str):
+        print(f"Sending SMS with message: {message}")
+
+
+class DeliveryResult:
+    """What happened to one message"""
+
+    def __init__(self, message, delivered, attempts, latency, queued, error=None):
+        self.message = message
+        self.delivered = delivered
+        self.attempts = attempts
+        self.latency = latency  # seconds from getting a free slot until done, including all retries
+        self.queued = queued    # seconds spent waiting for a free slot
+        self.error = error
+
+    @property
+    def total(self):
+        """Seconds from send_notification() until done: what the caller actually waited"""
+        return self.queued + self.latency
+
+    def __repr__(self):
+        status = "delivered" if self.delivered else f"failed ({self.error!r})"
+        return f"DeliveryResult({self.message!r}, {status}, attempts={self.attempts}, latency={self.latency * 1000:.1f}ms)"
+
+
+# The asynchronous abstraction
+class AsyncNotificationService(ABC):
+    # Is a timed-out attempt safe to retry? Only if cancelling it really stopped the send
+    retry_timeouts = True
+
+    def __init__(self, concurrency=100, timeout=1.0, retries=3, backoff=0.01):
+        self.concurrency = concurrency  # how many messages may be in flight at the same time
+        self.timeout = timeout          # seconds per attempt
+        self.retries = retries          # extra attempts after the first one
+        self.backoff = backoff          # base delay before the first retry
+        self._semaphores = weakref.WeakKeyDictionary()  # event loop -> its semaphore (one per asyncio.run())
+
+    def _semaphore(self):
+        """A semaphore belongs to the event loop it is used in, so every loop gets its own"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.concurrency)
+        return semaphore
+
+    @abstractmethod
+    async def _transmit(self, message: str):
+        """One attempt to hand the message to the provider. Subclasses implement HOW."""
+        pass
+
+    async def send_notification(self, message: str) -> DeliveryResult:
+        """Send one message with concurrency limit, per-attempt timeout and retries.
+        Never raises: an error is reported in the DeliveryResult, so one bad message cannot fail a whole batch."""
+        queued_at = time.perf_counter()
+        async with self._semaphore():
+            start = time.perf_counter()
+            for attempt in range(1, self.retries + 2):
+                try:
+                    await asyncio.wait_for(self._transmit(message), self.timeout)
+                    return DeliveryResult(message, True, attempt, time.perf_counter() - start, start - queued_at)
+                except (asyncio.TimeoutError, ConnectionError) as exc:
+                    error = exc
+                    if isinstance(exc, asyncio.TimeoutError) and not self.retry_timeouts:
+                        break  # the message may still go out: a retry could deliver it twice
+                    if attempt <= self.retries:
+                        # "full jitter": wait a random time between 0 and the exponential backoff
+                        await asyncio.sleep(random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+                except Exception as exc:  # not a transient network problem: retrying will not help
+                    error = exc
+                    break
+        return DeliveryResult(message, False, attempt, time.perf_counter() - start, start - queued_at, error)
+
+    async def send_many(self, messages):
+        """Send a batch of messages concurrently. Results come back in the same order."""
+        return await asyncio.gather(*(self.send_notification(message) for message in messages))
+
+
+# A local, in-process stand-in for a mail relay or SMS provider, so everything can be benchmarked offline
+class LocalGateway:
+    def __init__(self, name, latency=0.005, jitter=0.003, failure_rate=0.01, stall_rate=0.001):
+        self.name = name
+        self.latency = latency            # typical time to accept a message
+        self.jitter = jitter              # +/- random variation of that time
+        self.failure_rate = failure_rate  # share of attempts that fail with a connection error
+        self.stall_rate = stall_rate      # share of attempts that hang (until the client times out)
+        self.delivered = []
+
+    async def accept(self, recipient_kind, message):
+        roll = random.random()
+        if roll < self.stall_rate:
+            await asyncio.sleep(3600)
+        await asyncio.sleep(max(0.0, random.uniform(self.latency - self.jitter, self.latency + self.jitter)))
+        if roll < self.stall_rate + self.failure_rate:
+            raise ConnectionError(f"{self.name} dropped the connection")
+        self.delivered.append((recipient_kind, message))
+
+
+class AsyncEmailService(AsyncNotificationService):
+    def __init__(self, gateway, **options):
+        super().__init__(**options)
+        self.gateway = gateway
+
+    async def _transmit(self, message: str):
+        await self.gateway.accept("email", message)
+
+
+class AsyncSMSService(AsyncNotificationService):
+    def __init__(self, gateway, **options):
+        super().__init__(**options)
+        self.gateway = gateway
+
+    async def _transmit(self, message: str):
+        await self.gateway.accept("sms", message[:160])  # an SMS is at most 160 characters
+
+
+class SyncServiceAdapter(AsyncNotificationService):
+    """Makes any synchronous NotificationService usable where an async one is expected.
+    The blocking call runs in a worker thread, so the event loop keeps running.
+    A thread cannot be cancelled: after a timeout the send goes on, so a timed-out message is not retried."""
+
+    retry_timeouts = False
+
+    def __init__(self, service: NotificationService, **options):
+        options.setdefault("concurrency", 8)  # do not start more threads than make sense
+        super().__init__(**options)
+        self.service = service
+
+    async def _transmit(self, message: str):
+        await asyncio.to_thread(self.service.send_notification, message)
+
+
+# The Order still only knows the abstraction
+class Order:
+    def __init__(self, notification_service: AsyncNotificationService):
+        self.notification_service = notification_service
+
+    async def create(self):
+        print("Order created.")
+        return await self.notification_service.send_notification("Your order has been created.")
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def benchmark(service_factory, n_messages):
+    service = service_factory()
+    start = time.perf_counter()
+    results = await service.send_many([f"message {i}" for i in range(n_messages)])
+    elapsed = time.perf_counter() - start
+    failed = sum(not result.delivered for result in results)
+    return (n_messages / elapsed, percentile([result.latency for result in results], 0.99),
+            percentile([result.total for result in results], 0.99), failed)
+
+
+async def main():
+    gateway = LocalGateway("local-relay")
+
+    # The async Order with an async service and with an OLD sync service through the adapter
+    print(await Order(AsyncEmailService(gateway)).create())
+    print(await Order(SyncServiceAdapter(SMSService())).create())
+
+    print("\n=== Throughput and latency against the local gateway ===")
+    # "p99 send" starts when the message gets a free slot, "p99 total" when send_many() was called:
+    # with a small concurrency limit most of the time is spent waiting for a slot
+    print(f"{'concurrency':>12} {'messages/sec':>14} {'p99 send':>11} {'p99 total':>11} {'failed':>7}")
+    for concurrency in (1, 10, 100, 1000):
+        n_messages = 200 if concurrency == 1 else 5_000
+        throughput, p99, p99_total, failed = await benchmark(
+            lambda: AsyncEmailService(gateway, concurrency=concurrency, timeout=0.1), n_messages)
+        print(f"{concurrency:>12} {throughput:>14,.0f} {p99 * 1000:>9.1f}ms {p99_total * 1000:>9.1f}ms {failed:>7}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
+
+# Notice what did NOT change: Order still depends only on an abstraction (low coupling),
+# and the old EmailService/SMSService classes did not have to be touched to be used asynchronously.
+# The concurrency limit matters: without it, 100k messages would open 100k connections to the provider at once.
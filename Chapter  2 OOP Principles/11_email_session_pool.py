@@ -0,0 +1,247 @@
+"""Abstraction pays off when the implementation has to change.
+In 3_abstraction.py every call of send_email() runs _connect, _authenticate and _disconnect.
+Against a real mail relay that means a TCP + TLS handshake and a login for EVERY single email.
+
+Here the hidden implementation is replaced by a SESSION POOL:
+- authenticated connections are kept open and reused for the next send_email() call
+- a connection that was idle for a while is health-checked (a cheap NOOP) before it is reused,
+  and replaced if the server has closed it in the meantime
+- the pool never holds more than max_size connections; callers wait for a free one
+- send_many() sends a whole batch over ONE session and pipelines it (all messages in one round trip)
+
+The user of the class still just calls send_email(). That is the whole point of abstraction:
+the public interface stays the same while _connect, _authenticate and _disconnect are used in a smarter way.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+
+class MailConnection:
+    """Stand-in for a socket to a mail relay. Every round trip to the server costs `round_trip` seconds."""
+
+    def __init__(self, round_trip, server_idle_timeout):
+        self.round_trip = round_trip
+        self.server_idle_timeout = server_idle_timeout  # the SERVER closes connections idle for longer than this
+        self.authenticated = False
+        self.closed = False
+        self.last_used = time.monotonic()
+        self.sent = 0
+
+    def _exchange(self, round_trips=1):
+        if self.closed or time.monotonic() - self.last_used > self.server_idle_timeout:
+            self.closed = True
+            raise ConnectionError("connection closed by server")
+        time.sleep(self.round_trip * round_trips)
+        self.last_used = time.monotonic()
+
+    def noop(self):
+        self._exchange()
+
+    def send(self, messages):
+        """Pipelining: all messages are written at once and the replies are read at once"""
+        self._exchange()
+        self.sent += len(messages)
+
+
+class SessionPool:
+    """Keeps up to max_size open sessions and hands them out one caller at a time"""
+
+    def __init__(self, create, health_check, destroy, max_size=4, health_check_after=1.0, max_idle=60.0):
+        self._create = create            # makes a new, ready-to-use session
+        self._health_check = health_check
+        self._destroy = destroy
+        self.max_size = max_size
+        self.health_check_after = health_check_after  # check sessions that were idle longer than this
+        self.max_idle = max_idle                      # close sessions that were idle longer than this
+        self._idle = []                               # (session, returned_at), most recently used last
+        self._size = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def session(self, timeout=None):
+        session = self._acquire(timeout)
+        try:
+            yield session
+        except BaseException:
+            # ConnectionError or not: after a failure half way, nobody knows the state of the session
+            self._discard(session)
+            raise
+        else:
+            self._release(session)
+
+    def close(self):
+        """Close the idle sessions. Sessions still in use are closed when they are given back."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._size -= len(idle)
+        for session, _ in idle:
+            self._destroy(session)
+
+    def _acquire(self, timeout):
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError("no mail session became free in time")
+                    self._cond.wait(remaining)
+                if self._idle:
+                    session, returned_at = self._idle.pop()
+                else:
+                    self._size += 1
+                    session, returned_at = None, None
+
+            if session is None:
+                try:
+                    return self._create()
+                except BaseException:
+                    with self._cond:
+                        self._size -= 1
+                        self._cond.notify()
+                    raise
+
+            idle_for = time.monotonic() - returned_at
+            if idle_for > self.max_idle:
+                self._discard(session)
+                continue
+            if idle_for > self.health_check_after:
+                try:
+                    self._health_check(session)
+                except ConnectionError:
+                    self._discard(session)
+                    continue
+                except BaseException:
+                    self._discard(session)
+                    raise
+            return session
+
+    def _release(self, session):
+        with self._cond:
+            if not self._closed:
+                self._idle.append((session, time.monotonic()))
+                self._cond.notify()
+                return
+        self._discard(session)
+
+    def _discard(self, session):
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+        try:
+            self._destroy(session)
+        except ConnectionError:
+            pass
+
+
+class EmailService:
+    def __init__(self, pool_size=4, round_trip=0.001, server_idle_timeout=30.0, health_check_after=1.0):
+        self.round_trip = round_trip
+        self.server_idle_timeout = server_idle_timeout
+        self._pool = SessionPool(self._open_session, self._check_session, self._disconnect,
+                                 max_size=pool_size, health_check_after=health_check_after)
+
+    def send_email(self, message="Hello!"):  # Public method to send an email
+        with self._pool.session() as connection:
+            connection.send([message])
+
+    def send_many(self, messages):
+        """Public method to send a batch of emails over one session in one pipelined exchange"""
+        messages = list(messages)
+        with self._pool.session() as connection:
+            connection.send(messages)
+
+    def close(self):
+        self._pool.close()
+
+    def _open_session(self):
+        connection = self._connect()
+        self._authenticate(connection)
+        return connection
+
+    def _check_session(self, connection):
+        """Protected method: a cheap NOOP round trip tells us if the server still talks to us"""
+        connection.noop()
+
+    def _connect(self):
+        """Protected method to simulate connecting to an email server (TCP + TLS handshake)"""
+        print("Connecting to email server...")
+        connection = MailConnection(self.round_trip, self.server_idle_timeout)
+        connection._exchange(round_trips=3)
+        return connection
+
+    def _authenticate(self, connection):
+        """Protected method to simulate authenticating with the email server"""
+        print("Authenticating...")
+        connection._exchange()
+        connection.authenticated = True
+
+    def _disconnect(self, connection):
+        """Protected method to simulate disconnecting from the email server"""
+        print("Disconnecting from email server...")
+        if not connection.closed:
+            connection.closed = True
+            time.sleep(connection.round_trip)
+
+
+class UnpooledEmailService(EmailService):
+    """The behaviour of 3_abstraction.py for comparison: a new session for every email"""
+
+    def send_email(self, message="Hello!"):
+        connection = self._open_session()
+        connection.send([message])
+        self._disconnect(connection)
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    from concurrent.futures import ThreadPoolExecutor
+
+    # The user of the class does exactly what they did before
+    email = EmailService()
+    email.send_email()
+    email.send_email()  # reuses the open session: no "Connecting..." this time
+    email.close()
+
+    # When the server drops an idle session, the health check notices and a new one is opened
+    email = EmailService(server_idle_timeout=0.05, health_check_after=0.01)
+    email.send_email()
+    time.sleep(0.1)
+    print("...idle for longer than the server allows...")
+    email.send_email()
+    email.close()
+
+    n = 200
+    messages = [f"Newsletter #{i}" for i in range(n)]
+    timings = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        service = UnpooledEmailService()
+        start = time.perf_counter()
+        for message in messages:
+            service.send_email(message)
+        timings["new session per email"] = time.perf_counter() - start
+
+        service = EmailService(pool_size=4)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(service.send_email, messages))
+        timings["pool of 4 sessions, 4 threads"] = time.perf_counter() - start
+        service.close()
+
+        service = EmailService(pool_size=1)
+        start = time.perf_counter()
+        service.send_many(messages)
+        timings["send_many, one pipelined session"] = time.perf_counter() - start
+        service.close()
+
+    print(f"\nSending {n} emails with a 1ms round trip:")
+    for name, seconds in timings.items():
+        print(f"  {name:<34} {seconds * 1000:>8.1f}ms")
+
+"""In summary, because _connect, _authenticate and _disconnect were hidden behind send_email(), we could replace
+'one session per email' with 'a pool of reusable sessions' without changing a single line of the code that sends emails."""
@@ -0,0 +1,323 @@
+"""Low coupling in CODE (6_coupling.py) does not automatically mean low coupling at RUNTIME.
+Order.create() still calls the notification service inline, so the order takes as long as the email/SMS,
+and one slow provider stalls every checkout.
+
+The TRANSACTIONAL OUTBOX pattern decouples the two in time as well:
+- Order.create() writes the order AND the notification into a local database in ONE transaction
+  (either both are stored or neither is), and returns immediately
+- a pool of worker threads reads pending notifications from the outbox table and hands them to the
+  injected NotificationService
+- delivery is AT LEAST ONCE: a message is only marked as sent after the service accepted it, so after a crash
+  it may be sent again. Every message carries a DEDUP KEY so it is enqueued only once and a receiver can drop repeats
+- a message that still fails after max_attempts goes to the DEAD LETTERS: it stays in the table,
+  is no longer retried, and dead_letters() lists it for a human to look at
+- backlog() tells how many notifications are still waiting, which is the metric to alert on
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class NotificationService(ABC):
+    @abstractmethod
+    def send_notification(self, message: str):
+        pass
+
+
+class EmailService(NotificationService):
+    def send_notification(self, message: str):
+        print(f"Sending email with message: {message}")
+
+
+class SMSService(NotificationService):
+    def send_notification(self, message: str):
+        print(f"Sending SMS with message: {message}")
+
+
+class DeduplicatingNotificationService(NotificationService):
+    """Receiver-side protection against the duplicates that at-least-once delivery can produce.
+    Only the last max_keys keys are remembered: duplicates come from retries, which happen soon after the first try."""
+
+    def __init__(self, service: NotificationService, max_keys=100_000):
+        self.service = service
+        self.max_keys = max_keys
+        self._seen = OrderedDict()  # dedup key -> None, oldest first
+        self._lock = threading.Lock()
+
+    def send_notification(self, message: str):
+        self.service.send_notification(message)
+
+    def send_keyed(self, dedup_key: str, message: str):
+        with self._lock:
+            if dedup_key in self._seen:
+                return
+            self._seen[dedup_key] = None
+            if len(self._seen) > self.max_keys:
+                self._seen.popitem(last=False)
+        try:
+            self.service.send_notification(message)
+        except Exception:
+            with self._lock:
+                self._seen.pop(dedup_key, None)  # not delivered after all: allow the retry
+            raise
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at  REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS outbox (
+    id            INTEGER PRIMARY KEY AUTOINCREMENT,
+    dedup_key     TEXT NOT NULL UNIQUE,
+    message       TEXT NOT NULL,
+    created_at    REAL NOT NULL,
+    available_at  REAL NOT NULL,
+    leased_until  REAL NOT NULL DEFAULT 0,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    sent_at       REAL,
+    dead_at       REAL,
+    last_error    TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_pending ON outbox (sent_at, available_at);
+"""
+
+
+def connect(path):
+    """Every thread gets its own connection; WAL mode lets readers and one writer work at the same time"""
+    connection = sqlite3.connect(path, isolation_level=None, timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class Outbox:
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()  # sqlite3 connections may only be used by the thread that opened them
+        self._db.executescript(SCHEMA)
+
+    @property
+    def _db(self):
+        """The calling thread's connection, opened on first use"""
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = self._local.db = connect(self.path)
+        return db
+
+    def enqueue(self, dedup_key, message, db=None):
+        """Add a notification. A second notification with the same dedup key is ignored."""
+        now = time.time()
+        (db or self._db).execute(
+            "INSERT OR IGNORE INTO outbox (dedup_key, message, created_at, available_at) VALUES (?, ?, ?, ?)",
+            (dedup_key, message, now, now))
+
+    def backlog(self):
+        """How many notifications are not delivered yet, and how old the oldest one is (seconds)"""
+        count, oldest = self._db.execute(
+            "SELECT COUNT(*), MIN(created_at) FROM outbox WHERE sent_at IS NULL AND dead_at IS NULL").fetchone()
+        return count, (time.time() - oldest) if oldest else 0.0
+
+    def dead_letters(self):
+        """[(dedup_key, message, attempts, last_error)] of the notifications that were given up"""
+        return self._db.execute("SELECT dedup_key, message, attempts, last_error FROM outbox "
+                                "WHERE dead_at IS NOT NULL ORDER BY id").fetchall()
+
+    def transaction(self):
+        return _Transaction(self._db)
+
+
+class _Transaction:
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+
+
+class Order:
+    def __init__(self, outbox: Outbox):
+        self.outbox = outbox
+
+    def create(self):
+        """Store the order and its notification together. Nothing here waits for the notifier."""
+        with self.outbox.transaction() as db:
+            order_id = db.execute("INSERT INTO orders (created_at) VALUES (?)", (time.time(),)).lastrowid
+            self.outbox.enqueue(f"order-{order_id}-created", f"Your order {order_id} has been created.", db)
+        print("Order created.")
+        return order_id
+
+
+class InlineOrder:
+    """The Order of 6_coupling.py, for comparison: it waits for the notifier"""
+
+    def __init__(self, notification_service: NotificationService):
+        self.notification_service = notification_service
+
+    def create(self):
+        print("Order created.")
+        self.notification_service.send_notification("Your order has been created.")
+
+
+class OutboxWorkerPool:
+    def __init__(self, outbox: Outbox, notification_service: NotificationService, workers=4,
+                 batch_size=10, lease=30.0, retry_delay=1.0, max_attempts=8, poll_interval=0.05):
+        self.outbox = outbox
+        self.notification_service = notification_service
+        self.batch_size = batch_size
+        self.lease = lease              # a claimed message is redelivered if not done within this time (worker died)
+        self.retry_delay = retry_delay  # wait before retrying a failed message, doubled per attempt
+        self.max_attempts = max_attempts  # after that many failures the message is a dead letter
+        self.poll_interval = poll_interval
+        self.delivered = 0
+        self.failed_attempts = 0
+        self.dead = 0
+        self._stop = threading.Event()
+        self._counter_lock = threading.Lock()
+        self._threads = [threading.Thread(target=self._run, name=f"outbox-worker-{i}", daemon=True)
+                         for i in range(workers)]
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        for thread in self._threads:
+            thread.join()
+
+    def _run(self):
+        db = connect(self.outbox.path)
+        while not self._stop.is_set():
+            try:
+                batch = self._claim(db)
+                if not batch:
+                    self._stop.wait(self.poll_interval)
+                    continue
+                for row_id, dedup_key, message, attempts in batch:
+                    self._deliver(db, row_id, dedup_key, message, attempts)
+            except sqlite3.Error:
+                # e.g. "database is locked" for longer than the timeout. The worker keeps running:
+                # a message whose state could not be saved is claimed again when its lease runs out
+                logger.exception("outbox worker: database error")
+                self._stop.wait(self.poll_interval)
+        db.close()
+
+    def _claim(self, db):
+        """Lease a batch of due messages so no other worker picks them up at the same time"""
+        now = time.time()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            batch = db.execute(
+                "SELECT id, dedup_key, message, attempts FROM outbox "
+                "WHERE sent_at IS NULL AND dead_at IS NULL AND available_at <= ? AND leased_until <= ? "
+                "ORDER BY id LIMIT ?",
+                (now, now, self.batch_size)).fetchall()
+            db.executemany("UPDATE outbox SET leased_until = ? WHERE id = ?",
+                           [(now + self.lease, row[0]) for row in batch])
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return batch
+
+    def _deliver(self, db, row_id, dedup_key, message, attempts):
+        try:
+            send_keyed = getattr(self.notification_service, "send_keyed", None)
+            if send_keyed is not None:
+                send_keyed(dedup_key, message)
+            else:
+                self.notification_service.send_notification(message)
+        except Exception as exc:
+            error = f"{type(exc).__name__}: {exc}"
+            if attempts + 1 >= self.max_attempts:
+                db.execute("UPDATE outbox SET attempts = attempts + 1, dead_at = ?, last_error = ? WHERE id = ?",
+                           (time.time(), error, row_id))
+                logger.warning("outbox: %s moved to the dead letters after %d attempts (%s)",
+                               dedup_key, attempts + 1, error)
+            else:
+                delay = self.retry_delay * 2 ** attempts
+                db.execute("UPDATE outbox SET attempts = attempts + 1, available_at = ?, leased_until = 0, "
+                           "last_error = ? WHERE id = ?", (time.time() + delay, error, row_id))
+            with self._counter_lock:
+                self.failed_attempts += 1
+                self.dead += attempts + 1 >= self.max_attempts
+            return
+        db.execute("UPDATE outbox SET sent_at = ?, attempts = attempts + 1 WHERE id = ?", (time.time(), row_id))
+        with self._counter_lock:
+            self.delivered += 1
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import os
+    import random
+    import tempfile
+
+    class SlowFlakyEmailService(NotificationService):
+        """A provider that takes 20ms per email and fails 5% of the time"""
+
+        def send_notification(self, message: str):
+            time.sleep(0.02)
+            if random.random() < 0.05:
+                raise ConnectionError("provider unavailable")
+
+    n_orders = 300
+    outbox = Outbox(os.path.join(tempfile.mkdtemp(), "shop.db"))
+    service = DeduplicatingNotificationService(SlowFlakyEmailService())
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inline = InlineOrder(SlowFlakyEmailService())
+        start = time.perf_counter()
+        for _ in range(50):
+            try:
+                inline.create()
+            except ConnectionError:
+                pass  # with the inline version a provider error even breaks the checkout
+        inline_latency = (time.perf_counter() - start) / 50
+
+        order = Order(outbox)
+        start = time.perf_counter()
+        for _ in range(n_orders):
+            order.create()
+        outbox_latency = (time.perf_counter() - start) / n_orders
+
+    outbox.enqueue("order-1-created", "this duplicate is ignored")
+    print(f"Checkout latency, notifier inline: {inline_latency * 1000:6.2f}ms")
+    print(f"Checkout latency, with outbox:     {outbox_latency * 1000:6.2f}ms")
+    print(f"Backlog after checkout: {outbox.backlog()[0]} notifications")
+
+    workers = OutboxWorkerPool(outbox, service, workers=8, retry_delay=0.05).start()
+    while True:
+        count, oldest = outbox.backlog()
+        print(f"  backlog: {count:4d} notifications, oldest waiting {oldest:5.2f}s")
+        if count == 0:
+            break
+        time.sleep(0.25)
+    workers.stop()
+    print(f"Delivered {workers.delivered}, failed attempts: {workers.failed_attempts}, "
+          f"dead letters: {len(outbox.dead_letters())}")
+
+    # Order.create() from other threads (a web server's request threads): every thread uses its own connection
+    with contextlib.redirect_stdout(io.StringIO()):
+        threads = [threading.Thread(target=lambda: [order.create() for _ in range(20)]) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    print(f"Backlog after 80 orders from 4 threads: {outbox.backlog()[0]} notifications")
+
+#The Order class still depends only on an abstraction, but now it does not even wait for it.
+#The price is that notifications arrive a little later and may (rarely) arrive twice, which is why they carry a dedup key.
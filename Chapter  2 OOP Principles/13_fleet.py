@@ -0,0 +1,216 @@
+"""
+Polymorphism lets us write `vehicle.start()` for every kind of vehicle (see 5_polymorphism.py).
+For a fleet controller that sends start/stop to 100k+ vehicles per command, two costs remain:
+- for EVERY vehicle Python has to look up which start() to call (the dynamic dispatch),
+  and the version without polymorphism even does an isinstance chain per vehicle
+- the vehicles are handled one after the other, even if each start() mostly WAITS (for a network reply)
+
+A Fleet groups its vehicles by concrete class. The method to call is looked up ONCE per class,
+and the groups are cut into chunks that run on a thread pool. Every vehicle's call is timed,
+and an exception in one vehicle is recorded in the report instead of aborting the whole command.
+"""
+
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Vehicle:
+    def __init__(self, brand, model, year):
+        self.brand = brand
+        self.model = model
+        self.year = year
+
+    def start(self):
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def stop(self):
+        raise NotImplementedError("Subclasses must implement this method")
+
+
+class Car(Vehicle):
+    def __init__(self, brand, model, year, number_of_doors):
+        super().__init__(brand, model, year)
+        self.number_of_doors = number_of_doors
+
+    def start(self):
+        print("Car is starting..")
+
+    def stop(self):
+        print("Car is stopping.")
+
+
+class Motorcycle(Vehicle):
+    def __init__(self, brand, model, year, has_sidecar):
+        super().__init__(brand, model, year)
+        self.has_sidecar = has_sidecar
+
+    def start(self):
+        print("Motorcycle is starting..")
+
+    def stop(self):
+        print("Motorcycle is stopping.")
+
+
+class CommandReport:
+    """The outcome of one fleet-wide command"""
+
+    def __init__(self, command):
+        self.command = command
+        self.succeeded = 0
+        self.errors = []     # (vehicle, exception)
+        self.durations = []  # seconds per vehicle
+        self.elapsed = 0.0   # wall-clock seconds for the whole command
+
+    def _merge(self, succeeded, errors, durations):
+        self.succeeded += succeeded
+        self.errors.extend(errors)
+        self.durations.extend(durations)
+
+    def percentile(self, fraction):
+        if not self.durations:
+            return 0.0
+        ordered = sorted(self.durations)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def __repr__(self):
+        return (f"CommandReport({self.command}: {self.succeeded} ok, {len(self.errors)} failed, "
+                f"{self.elapsed * 1000:.1f}ms total, p99 per vehicle {self.percentile(0.99) * 1e6:.1f}us)")
+
+
+class Fleet:
+    def __init__(self, vehicles=(), workers=8, chunk_size=1000):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._groups = defaultdict(list)  # concrete class -> its vehicles
+        for vehicle in vehicles:
+            self.add(vehicle)
+
+    def __len__(self):
+        return sum(len(group) for group in self._groups.values())
+
+    def add(self, vehicle: Vehicle):
+        self._groups[type(vehicle)].append(vehicle)
+
+    def remove(self, vehicle: Vehicle):
+        self._groups[type(vehicle)].remove(vehicle)
+
+    def count_by_type(self):
+        return {cls.__name__: len(group) for cls, group in self._groups.items()}
+
+    def start_all(self, parallel=True):
+        return self.run_command("start", parallel)
+
+    def stop_all(self, parallel=True):
+        return self.run_command("stop", parallel)
+
+    def run_command(self, method_name, parallel=True):
+        """Call `method_name` on every vehicle. The method is resolved once per class."""
+        report = CommandReport(method_name)
+        chunks = []
+        for cls, group in self._groups.items():
+            method = getattr(cls, method_name)  # the dispatch, done once for the whole group
+            for start in range(0, len(group), self.chunk_size):
+                chunks.append((method, group[start:start + self.chunk_size]))
+
+        started = time.perf_counter()
+        if parallel and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=self.workers) as executor:
+                for result in executor.map(lambda chunk: _run_chunk(*chunk), chunks):
+                    report._merge(*result)
+        else:
+            for method, vehicles in chunks:
+                report._merge(*_run_chunk(method, vehicles))
+        report.elapsed = time.perf_counter() - started
+        return report
+
+
+def _run_chunk(method, vehicles):
+    succeeded, errors = 0, []
+    durations = [0.0] * len(vehicles)
+    clock = time.perf_counter
+    for i, vehicle in enumerate(vehicles):
+        started = clock()
+        try:
+            method(vehicle)
+            succeeded += 1
+        except Exception as exc:
+            errors.append((vehicle, exc))
+        durations[i] = clock() - started
+    return succeeded, errors, durations
+
+
+if __name__ == "__main__":
+    import contextlib
+    import random
+
+    class NullWriter:
+        def write(self, text):
+            return len(text)
+
+        def flush(self):
+            pass
+
+    class ConnectedCar(Car):
+        """A car whose start/stop waits for a reply from the car over the network"""
+
+        def start(self):
+            time.sleep(0.001)
+            if random.random() < 0.01:
+                raise TimeoutError(f"{self.brand} {self.model} did not answer")
+
+        def stop(self):
+            time.sleep(0.001)
+
+    fleet = Fleet([Car("Toyota", "Camry", 2020, 4), Motorcycle("Harley-Davidson", "Street 750", 2019, False)])
+    print(fleet.start_all())
+    print(fleet.stop_all())
+
+    # 1) 100k vehicles whose start/stop is pure Python work
+    vehicles = [Car("Toyota", "Camry", 2020, 4) if i % 2 else Motorcycle("Harley-Davidson", "Street 750", 2019, False)
+                for i in range(100_000)]
+    fleet = Fleet(vehicles)
+    with contextlib.redirect_stdout(NullWriter()):
+        started = time.perf_counter()
+        for vehicle in vehicles:
+            if isinstance(vehicle, Car):
+                vehicle.start()
+            elif isinstance(vehicle, Motorcycle):
+                vehicle.start()
+        isinstance_loop = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for vehicle in vehicles:
+            vehicle.start()
+        plain_loop = time.perf_counter() - started
+
+        grouped = fleet.start_all(parallel=False)
+        threaded = fleet.start_all(parallel=True)
+
+    print(f"\nstart() on {len(fleet):,} vehicles {fleet.count_by_type()}")
+    print(f"  isinstance chain per vehicle:     {isinstance_loop:.3f}s")
+    print(f"  plain polymorphic loop:           {plain_loop:.3f}s")
+    print(f"  Fleet, dispatch once per type:    {grouped.elapsed:.3f}s (with per-vehicle timing)")
+    print(f"  Fleet, thread pool:               {threaded.elapsed:.3f}s")
+
+    # 2) 5k vehicles whose start/stop WAITS for the network: here the thread pool pays off
+    random.seed(3)
+    connected = [ConnectedCar("Tesla", "Model 3", 2022, 4) for _ in range(5_000)]
+    fleet = Fleet(connected, workers=32, chunk_size=100)
+    started = time.perf_counter()
+    for vehicle in connected[:500]:
+        try:
+            vehicle.start()
+        except TimeoutError:
+            pass
+    plain_loop = (time.perf_counter() - started) * 10
+    report = fleet.start_all()
+    print(f"\nstart() on {len(fleet):,} connected cars (1ms network wait each)")
+    print(f"  plain loop (extrapolated):        {plain_loop:.3f}s")
+    print(f"  Fleet, 32 threads:                {report.elapsed:.3f}s")
+    print(f"  {report}")
+    print(f"  first error: {report.errors[0][1]!r}" if report.errors else "  no errors")
+
+# The grouping does not break polymorphism: the Fleet still only calls start()/stop(),
+# it just asks each CLASS once which start()/stop() that is, instead of asking every object.
+# In CPython threads do not make pure-Python work faster (the GIL); they help when the method waits.
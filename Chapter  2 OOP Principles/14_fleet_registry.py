@@ -0,0 +1,274 @@
+"""
+Vehicel in 4_inheritance.py and Vehicle in 5_polymorphism.py both carry brand, model and year.
+Finding "all 2019 Harley-Davidson" in a list means looking at EVERY vehicle (a linear scan).
+
+Databases solve this with SECONDARY INDEXES, and we can do the same with plain Python objects:
+- a HASH INDEX (a dict from value to the set of vehicles) answers brand == "..." or model == "..." directly
+- a SORTED INDEX on year (the distinct years kept sorted, searched with bisect) answers year ranges
+- compound queries intersect the matching sets, starting with the smallest one, unless a
+  COMPOUND INDEX (a dict keyed by a tuple such as (brand, year)) answers them directly
+- group-by counts are just the sizes of the sets
+
+To keep the indexes correct when someone writes `car.year = 2021`, brand, model and year are
+DESCRIPTORS: assigning them tells every registry the vehicle is in to move it to the new value.
+"""
+
+import bisect
+from collections import defaultdict
+
+
+class IndexedAttribute:
+    """A normal attribute, except that changes are reported to the registries the vehicle is in"""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.storage_name = "_" + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance, self.storage_name)
+
+    def __set__(self, instance, value):
+        old_value = getattr(instance, self.storage_name, None)
+        setattr(instance, self.storage_name, value)
+        updated = []
+        try:
+            for registry in getattr(instance, "_registries", ()):
+                registry._reindex(instance, self.name, old_value, value)
+                updated.append(registry)
+        except BaseException:  # e.g. a year that cannot be sorted with the others: put everything back
+            setattr(instance, self.storage_name, old_value)
+            for registry in updated:
+                registry._reindex(instance, self.name, value, old_value)
+            raise
+
+
+class Vehicle:
+    brand = IndexedAttribute()
+    model = IndexedAttribute()
+    year = IndexedAttribute()
+
+    def __init__(self, brand, model, year):
+        self._registries = []
+        self.brand = brand
+        self.model = model
+        self.year = year
+
+    def start(self):
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def stop(self):
+        raise NotImplementedError("Subclasses must implement this method")
+
+    def __repr__(self):
+        return f"{type(self).__name__}({self.brand!r}, {self.model!r}, {self.year})"
+
+
+class Car(Vehicle):
+    def __init__(self, brand, model, year, number_of_doors):
+        super().__init__(brand, model, year)
+        self.number_of_doors = number_of_doors
+
+    def start(self):
+        print("Car is starting..")
+
+    def stop(self):
+        print("Car is stopping.")
+
+
+class Motorcycle(Vehicle):
+    def __init__(self, brand, model, year, has_sidecar):
+        super().__init__(brand, model, year)
+        self.has_sidecar = has_sidecar
+
+    def start(self):
+        print("Motorcycle is starting..")
+
+    def stop(self):
+        print("Motorcycle is stopping.")
+
+
+class FleetRegistry:
+    INDEXED = ("brand", "model", "year")
+
+    def __init__(self, vehicles=(), compound_indexes=(("brand", "year"),)):
+        self._vehicles = set()
+        self._indexes = {name: defaultdict(set) for name in self.INDEXED}  # value -> vehicles
+        self._years = []  # the distinct years, sorted: the sorted index
+        self._compound = {tuple(fields): defaultdict(set) for fields in compound_indexes}  # (values) -> vehicles
+        for vehicle in vehicles:
+            self.add(vehicle)
+
+    def __len__(self):
+        return len(self._vehicles)
+
+    def add(self, vehicle: Vehicle):
+        if vehicle in self._vehicles:
+            return
+        self._vehicles.add(vehicle)
+        vehicle._registries.append(self)
+        for name in self.INDEXED:
+            self._insert(name, getattr(vehicle, name), vehicle)
+        for fields, index in self._compound.items():
+            index[tuple(getattr(vehicle, field) for field in fields)].add(vehicle)
+
+    def remove(self, vehicle: Vehicle):
+        self._vehicles.remove(vehicle)
+        vehicle._registries.remove(self)
+        for name in self.INDEXED:
+            self._delete(name, getattr(vehicle, name), vehicle)
+        for fields in self._compound:
+            self._delete_compound(fields, tuple(getattr(vehicle, field) for field in fields), vehicle)
+
+    def find(self, brand=None, model=None, year=None, year_between=None):
+        """All vehicles matching every given condition. year_between=(first, last) includes both ends."""
+        candidate_sets = self._candidates(brand, model, year, year_between)
+        if candidate_sets is None:
+            return set(self._vehicles)
+        result = set(candidate_sets[0])
+        for other in candidate_sets[1:]:
+            result.intersection_update(other)
+            if not result:
+                break
+        return result
+
+    def count(self, brand=None, model=None, year=None, year_between=None):
+        candidate_sets = self._candidates(brand, model, year, year_between)
+        if candidate_sets is None:
+            return len(self._vehicles)
+        if len(candidate_sets) == 1:
+            return len(candidate_sets[0])  # answered by one index: no copy, no intersection
+        return len(self.find(brand, model, year, year_between))
+
+    def count_by(self, name):
+        """Group-by count on brand, model or year: {value: number of vehicles}"""
+        return {value: len(vehicles) for value, vehicles in self._indexes[name].items()}
+
+    def _candidates(self, brand, model, year, year_between):
+        """The index sets that together answer a query, smallest first (None: no condition at all)"""
+        equal = {name: value for name, value in (("brand", brand), ("model", model), ("year", year))
+                 if value is not None}
+        candidate_sets = []
+        for fields, index in self._compound.items():
+            if all(field in equal for field in fields):
+                candidate_sets.append(index.get(tuple(equal.pop(field) for field in fields), set()))
+        for name, value in equal.items():
+            candidate_sets.append(self._indexes[name].get(value, set()))
+        if year_between is not None:
+            candidate_sets.append(self._year_range(*year_between))
+        if not candidate_sets:
+            return None
+        candidate_sets.sort(key=len)  # intersect starting with the smallest set: least work
+        return candidate_sets
+
+    def _year_range(self, first, last):
+        low = bisect.bisect_left(self._years, first)
+        high = bisect.bisect_right(self._years, last)
+        by_year = self._indexes["year"]
+        if high - low == 1:
+            return by_year[self._years[low]]
+        return set().union(*(by_year[year] for year in self._years[low:high]))
+
+    def _insert(self, name, value, vehicle):
+        index = self._indexes[name]
+        bucket = index.get(value)
+        if bucket is None:
+            if name == "year":
+                bisect.insort(self._years, value)  # may raise TypeError: nothing has been changed yet
+            bucket = index[value] = set()
+        bucket.add(vehicle)
+
+    def _delete(self, name, value, vehicle):
+        index = self._indexes[name]
+        bucket = index.get(value)  # not index[value]: that would create an empty bucket for an unknown value
+        if bucket is None or vehicle not in bucket:
+            return
+        bucket.remove(vehicle)
+        if not bucket:
+            del index[value]
+            if name == "year":
+                position = bisect.bisect_left(self._years, value)
+                if position < len(self._years) and self._years[position] == value:
+                    del self._years[position]
+
+    def _delete_compound(self, fields, key, vehicle):
+        index = self._compound[fields]
+        bucket = index.get(key)
+        if bucket is None or vehicle not in bucket:
+            return
+        bucket.remove(vehicle)
+        if not bucket:
+            del index[key]
+
+    def _reindex(self, vehicle, name, old_value, new_value):
+        """Called by IndexedAttribute when brand, model or year of one of our vehicles changes"""
+        if old_value == new_value:
+            return
+        self._insert(name, new_value, vehicle)  # first: if the new value cannot be indexed, the old entry is still there
+        self._delete(name, old_value, vehicle)
+        for fields, index in self._compound.items():
+            if name in fields:
+                new_key = tuple(getattr(vehicle, field) for field in fields)
+                old_key = tuple(old_value if field == name else value for field, value in zip(fields, new_key))
+                self._delete_compound(fields, old_key, vehicle)
+                index[new_key].add(vehicle)
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    registry = FleetRegistry([
+        Car("Toyota", "Camry", 2020, 4),
+        Motorcycle("Harley-Davidson", "Street 750", 2019, False),
+        Motorcycle("Harley-Davidson", "Fat Boy", 2021, False),
+        Car("Toyota", "Corolla", 2019, 4),
+    ])
+    print(f"All 2019 Harley-Davidson: {registry.find(brand='Harley-Davidson', year=2019)}")
+    print(f"Built 2019..2020: {sorted(registry.find(year_between=(2019, 2020)), key=repr)}")
+    print(f"Vehicles per brand: {registry.count_by('brand')}")
+
+    fat_boy = next(iter(registry.find(model="Fat Boy")))
+    fat_boy.year = 2019  # the indexes follow the change
+    print(f"After changing the Fat Boy's year: {registry.count(brand='Harley-Davidson', year=2019)} 2019 Harleys")
+
+    # A big fleet
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(5)
+    catalogue = {
+        "Toyota": ["Camry", "Corolla", "RAV4", "Prius"], "Honda": ["Civic", "Accord", "CB500"],
+        "Harley-Davidson": ["Street 750", "Fat Boy", "Sportster"], "BMW": ["X5", "3 Series", "R 1250 GS"],
+        "Ford": ["Focus", "F-150", "Mustang"], "Tesla": ["Model 3", "Model Y"],
+    }
+    brands = list(catalogue)
+    vehicles = []
+    for _ in range(n):
+        brand = rng.choice(brands)
+        vehicles.append(Car(brand, rng.choice(catalogue[brand]), rng.randint(1990, 2024), 4))
+
+    started = time.perf_counter()
+    registry = FleetRegistry(vehicles)
+    print(f"\nIndexed {n:,} vehicles in {time.perf_counter() - started:.2f}s")
+
+    def timed(label, query, repeat=1000):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            result = query()
+        per_call = (time.perf_counter() - started) / repeat
+        print(f"  {label:<48} {per_call * 1e6:>12,.1f}us -> {result:,}")
+
+    timed("count(brand='Tesla')", lambda: registry.count(brand="Tesla"))
+    timed("count(year=2019)", lambda: registry.count(year=2019))
+    timed("count_by('brand')", lambda: len(registry.count_by("brand")))
+    timed("count(brand='Harley-Davidson', year=2019)", lambda: registry.count(brand="Harley-Davidson", year=2019))
+    timed("find(brand='Harley-Davidson', year=2019)", lambda: len(registry.find(brand="Harley-Davidson", year=2019)), 20)
+    timed("find(model='Fat Boy', year_between=(2018, 2020))",
+          lambda: len(registry.find(model="Fat Boy", year_between=(2018, 2020))), 20)
+    timed("linear scan for 2019 Harley-Davidson",
+          lambda: sum(1 for v in vehicles if v.brand == "Harley-Davidson" and v.year == 2019), 1)
+
+# Note: counts answered by one index (including the compound (brand, year) index) and group-by counts never touch
+# the vehicles and stay in the microseconds at any size.
+# Queries that RETURN vehicles cost time proportional to the size of the smallest matching set (the answer itself).
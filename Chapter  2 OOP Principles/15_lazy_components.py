@@ -0,0 +1,150 @@
+"""
+The Car in 7_composition.py builds a new Engine, Wheels, chassis and Seats in __init__, for EVERY car.
+In a simulation with millions of cars that is 4 extra objects per car, although:
+- most cars never call drive(), so the components are never used (they could be created LAZILY, on first access)
+- the components have no state of their own, so all cars could SHARE one of each (the FLYWEIGHT pattern)
+
+A Component descriptor on the class does both:
+    engine = Component(Engine)                   -> created on first access, one Engine shared by all cars
+    fuel_tank = Component(FuelTank, shared=False) -> created on first access, but every car gets its own
+A component that carries state (like the fuel level) must opt out of sharing with shared=False,
+otherwise filling up one car would fill up all of them.
+
+Because Component only defines __get__ (a "non-data descriptor"), the created object is stored in the car's
+__dict__ and found there directly on every later access: after the first access there is no extra cost.
+Assigning `car.engine = TurboEngine()` still works and replaces the component for that one car.
+"""
+
+
+class Component:
+    _flyweights = {}  # component class -> the one shared instance
+
+    def __init__(self, factory, shared=True):
+        self.factory = factory
+        self.shared = shared
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        if self.shared:
+            component = Component._flyweights.get(self.factory)
+            if component is None:
+                component = Component._flyweights[self.factory] = self.factory()
+        else:
+            component = self.factory()
+        instance.__dict__[self.name] = component  # from now on the attribute is found without calling __get__
+        return component
+
+
+class Engine:
+    def start(self):
+        print("Engine started.")
+
+
+class Wheels:
+    def rotate(self):
+        print("Wheels are rotating.")
+
+
+class chassis:
+    def support(self):
+        print("Chassis is supporting the vehicle.")
+
+
+class Seats:
+    def sit(self):
+        print("Sitting on the seat.")
+
+
+class FuelTank:
+    """NOT stateless: every car has its own fuel level"""
+
+    def __init__(self, capacity=50):
+        self.capacity = capacity
+        self.level = 0
+
+    def fill(self, liters):
+        self.level = min(self.capacity, self.level + liters)
+
+
+# The Car of 7_composition.py: four new components per car
+class EagerCar:
+    def __init__(self):
+        self.engine = Engine()
+        self.wheels = Wheels()
+        self.chassis = chassis()
+        self.seats = Seats()
+
+    def drive(self):
+        self.engine.start()
+        self.wheels.rotate()
+        self.chassis.support()
+        self.seats.sit()
+        print("Car is driving.")
+
+
+# Same composition, but nothing is built until a component is used
+class Car:
+    engine = Component(Engine)
+    wheels = Component(Wheels)
+    chassis = Component(chassis)
+    seats = Component(Seats)
+    fuel_tank = Component(FuelTank, shared=False)
+
+    def drive(self):
+        self.engine.start()
+        self.wheels.rotate()
+        self.chassis.support()
+        self.seats.sit()
+        print("Car is driving.")
+
+
+if __name__ == "__main__":
+    import contextlib
+    import gc
+    import sys
+    import time
+    import tracemalloc
+
+    my_car = Car()
+    my_car.drive()
+    other_car = Car()
+    print(f"Same Engine object in both cars: {my_car.engine is other_car.engine}")
+    my_car.fuel_tank.fill(30)
+    print(f"Fuel: my car {my_car.fuel_tank.level}l, other car {other_car.fuel_tank.level}l")
+
+    class NullWriter:
+        def write(self, text):
+            return len(text)
+
+        def flush(self):
+            pass
+
+    def measure(label, build, n, drive_every=0):
+        gc.collect()
+        tracemalloc.start()
+        started = time.perf_counter()
+        cars = [build() for _ in range(n)]
+        elapsed = time.perf_counter() - started
+        if drive_every:
+            with contextlib.redirect_stdout(NullWriter()):
+                for car in cars[::drive_every]:
+                    car.drive()
+        size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"  {label:<36} {elapsed:6.2f}s to build, {size / n:6.0f} bytes per car")
+        del cars
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(f"\nBuilding {n:,} cars")
+    measure("eager components (7_composition)", EagerCar, n)
+    measure("lazy flyweights, never driven", Car, n)
+    measure("lazy flyweights, 1 in 10 driven", Car, n, drive_every=10)
+    measure("lazy flyweights, all driven", Car, n, drive_every=1)
+
+# Note: tracemalloc slows the building down; the times are only meant to be compared with each other.
+# Sharing is only safe for components WITHOUT state: anything a car changes on its component (fuel level, mileage)
+# would change it for every car. That is what shared=False is for.
@@ -23,8 +23,8 @@ class EmailService:
 
     """The user of the class can send emails without knowing any of the internal implementation details involved sending an email. They have been abstracted away and life is simple for the user. """
 
-    email = EmailService()
-    email.send_email()
+email = EmailService()
+email.send_email()
 
 """In summary, abstraction in OOP helps manage complexity by allowing developers to work with higher-level concepts and interactions, while hiding the lower-level details that are not necessary for the task at hand."""
 
@@ -49,10 +49,10 @@ class Order:
         print("Order created.")
         self.notification_service.send_notification("Your order has been created.")
 
-    order = Order(EmailService())
-    order.create()
-    order_sms = Order(SMSService())
-    order_sms.create()
+order = Order(EmailService())
+order.create()
+order_sms = Order(SMSService())
+order_sms.create()
 
 #In this improved example, the 'Order' class depends on the 'NotificationService' abstraction rather than the concrete implementation 'EmailService'. This decouples the 'Order' class from the 'EmailService' class, allowing us to easily switch to a different notification service (like SMSService) without modifying the 'Order' class.
 #This decouples the 'Order' class from specific implementation of the notification service, promoting flexibility and maintainability in the codebase. This reduction in coupling makes the system more modular and easier to extend in the future.
@@ -0,0 +1,175 @@
+"""Encapsulation at scale: a columnar batch ledger.
+In 2_Encapsulation.py every BankAccount object keeps its own private __balance and every deposit/withdraw is a separate method call followed by a print.
+That is perfect for learning, but when millions of postings have to be replayed (for example in a settlement run) the per-object calls and the prints cost far more than the arithmetic.
+
+The idea here is to move the DATA into one contiguous typed array (one slot per account) owned by a Ledger, and to apply whole batches of postings in one go.
+The BankAccount class still encapsulates its balance: the balance property is now simply a view into the ledger's array, and the same rules apply:
+- deposits must be positive
+- withdrawals must satisfy 0 < amount <= balance
+Instead of printing, the batch methods return one accept (1) / reject (0) flag per posting.
+"""
+
+from array import array
+
+DEPOSIT = 1
+WITHDRAWAL = -1
+
+
+class Ledger:
+    """Keeps the balances of all accounts in one contiguous array of doubles"""
+
+    def __init__(self):
+        self._balances = array("d")
+
+    def __len__(self):
+        return len(self._balances)
+
+    def open_account(self, initial_balance=0.0):
+        """Reserve a slot for a new account and return its index (row) in the ledger"""
+        self._balances.append(initial_balance)
+        return len(self._balances) - 1
+
+    def balance_of(self, index):
+        """Read one balance straight out of the array"""
+        return self._balances[index]
+
+    def deposit(self, index, amount):
+        """Apply a single deposit, returns True if it was accepted"""
+        if amount > 0:
+            self._balances[index] += amount
+            return True
+        return False
+
+    def withdraw(self, index, amount):
+        """Apply a single withdrawal, returns True if it was accepted"""
+        if 0 < amount <= self._balances[index]:
+            self._balances[index] -= amount
+            return True
+        return False
+
+    def apply_deposits(self, indices, amounts):
+        """Apply a whole batch of deposits. Returns one accept/reject flag per row"""
+        return self.apply_batch(indices, [DEPOSIT] * len(indices), amounts)
+
+    def apply_withdrawals(self, indices, amounts):
+        """Apply a whole batch of withdrawals. Returns one accept/reject flag per row"""
+        return self.apply_batch(indices, [WITHDRAWAL] * len(indices), amounts)
+
+    def apply_batch(self, indices, kinds, amounts):
+        """Apply a batch of postings given as three parallel columns:
+        indices -> which account (row in the ledger)
+        kinds   -> DEPOSIT or WITHDRAWAL
+        amounts -> how much
+        Postings are applied in order, so a withdrawal can use money deposited earlier in the same batch.
+        Returns an array('b') with 1 for every accepted posting and 0 for every rejected one.
+        A batch is all or nothing: if a posting has an unknown kind or a bad index, no balance changes at all."""
+        if not len(indices) == len(kinds) == len(amounts):
+            raise ValueError("indices, kinds and amounts must have the same length")
+        # Work on a copy and only swap it in once the whole batch went through, so an error half-way
+        # cannot leave the first half applied. Copying an array of doubles is one memcpy, cheap next to the loop.
+        balances = self._balances[:]  # (also a local name: faster than attribute lookups inside the loop)
+        results = array("b", bytes(len(indices)))
+        for row, (index, kind, amount) in enumerate(zip(indices, kinds, amounts)):
+            if kind == DEPOSIT:
+                if amount > 0:
+                    balances[index] += amount
+                    results[row] = 1
+            elif kind == WITHDRAWAL:
+                if 0 < amount <= balances[index]:
+                    balances[index] -= amount
+                    results[row] = 1
+            else:
+                raise ValueError(f"Unknown posting kind: {kind}")
+        self._balances = balances
+        return results
+
+
+class BankAccount:
+    default_ledger = Ledger()  # static attribute: accounts share one ledger unless told otherwise
+
+    def __init__(self, balance, ledger=None):
+        self.__ledger = ledger if ledger is not None else BankAccount.default_ledger  # Private attribute
+        self.__index = self.__ledger.open_account(balance)  # Private attribute: our row in the ledger
+
+    @property
+    def balance(self):
+        """Getter method to access the balance (a view into the ledger's array)"""
+        return self.__ledger.balance_of(self.__index)
+
+    @property
+    def index(self):
+        """The row of this account in the ledger, used to build batches"""
+        return self.__index
+
+    def deposit(self, amount):
+        """Public method to deposit money into the account"""
+        if self.__ledger.deposit(self.__index, amount):
+            print(f"Deposited ${amount}. New balance: ${self.balance}")
+        else:
+            print("Deposit amount must be positive")
+
+    def withdraw(self, amount):
+        """Public method to withdraw money from the account"""
+        if self.__ledger.withdraw(self.__index, amount):
+            print(f"Withdrew ${amount}. New balance: ${self.balance}")
+        else:
+            print("Invalid withdrawal amount")
+
+
+if __name__ == "__main__":
+    import contextlib
+    import io
+    import random
+    import time
+
+    # The single-object interface works exactly like in 2_Encapsulation.py
+    ledger = Ledger()
+    myAccount = BankAccount(1000, ledger)
+    myAccount.deposit(500)  # Valid deposit
+    myAccount.withdraw(200)  # Valid withdrawal
+    myAccount.withdraw(5000)  # Invalid withdrawal
+    print(myAccount.balance)  # Accessing balance via getter -> 1300.0
+
+    # The batch interface: no prints, one flag per posting
+    other = BankAccount(50, ledger)
+    results = ledger.apply_batch(
+        [myAccount.index, other.index, other.index, other.index],
+        [WITHDRAWAL, WITHDRAWAL, DEPOSIT, WITHDRAWAL],
+        [300, 80, 40, 80],
+    )
+    print(list(results))  # [1, 0, 1, 1] -> the second posting is rejected, the fourth uses the deposit before it
+    print(myAccount.balance, other.balance)  # 1000.0 10.0
+
+    # A small settlement run: per-object calls vs one batch
+    n_accounts, n_postings = 10_000, 500_000
+    rng = random.Random(42)
+    indices = [rng.randrange(n_accounts) for _ in range(n_postings)]
+    kinds = [rng.choice((DEPOSIT, WITHDRAWAL)) for _ in range(n_postings)]
+    amounts = [rng.randint(-10, 200) for _ in range(n_postings)]
+
+    per_object_ledger = Ledger()
+    accounts = [BankAccount(100, per_object_ledger) for _ in range(n_accounts)]
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):  # even without a console the prints are expensive
+        for index, kind, amount in zip(indices, kinds, amounts):
+            if kind == DEPOSIT:
+                accounts[index].deposit(amount)
+            else:
+                accounts[index].withdraw(amount)
+    per_object_time = time.perf_counter() - start
+
+    batch_ledger = Ledger()
+    for _ in range(n_accounts):
+        batch_ledger.open_account(100)
+    start = time.perf_counter()
+    results = batch_ledger.apply_batch(indices, kinds, amounts)
+    batch_time = time.perf_counter() - start
+
+    print(f"\n{n_postings} postings over {n_accounts} accounts")
+    print(f"Per-object calls: {per_object_time:.3f}s")
+    print(f"One batch:        {batch_time:.3f}s ({sum(results)} accepted, {n_postings - sum(results)} rejected)")
+    print(f"Same balances:    {per_object_ledger._balances == batch_ledger._balances}")
+
+# Notice that encapsulation is still intact: nobody outside the Ledger writes to the array directly,
+# the rules for deposits and withdrawals live in exactly one place, and BankAccount.balance can still not be assigned.
+# We only changed WHERE the data lives (one array instead of many objects), not HOW it may be changed.
@@ -0,0 +1,150 @@
+"""
+Bulk Interest Accrual Example
+=============================
+
+In 5_static_attributes.py every account calculates its own interest:
+    interest = self.balance * BankAccount.interest_rate
+and set_interest_rate() simply overwrites the STATIC rate, so nobody knows WHEN it changed.
+
+For a nightly accrual over millions of accounts we want two things:
+1. a RATE HISTORY: set_interest_rate() records the date from which a rate is valid,
+   so a period that contains a rate change can be split into pieces
+2. a BULK pass: because the rate is STATIC (the same for every account), the whole
+   period collapses into ONE factor, and interest for all balances is balance * factor
+   computed in one pass over a contiguous array of balances
+
+Day-count conventions decide how many "years" a period is:
+    "ACT/365" -> actual days / 365
+    "ACT/360" -> actual days / 360
+    "30/360"  -> every month counts as 30 days, the year as 360 days
+"""
+
+from array import array
+from datetime import date
+
+
+def year_fraction(start, end, convention="ACT/365"):
+    """The length of the period start..end in years, according to a day-count convention"""
+    if convention == "ACT/365":
+        return (end - start).days / 365
+    if convention == "ACT/360":
+        return (end - start).days / 360
+    if convention == "30/360":
+        d1 = min(start.day, 30)
+        d2 = 30 if end.day == 31 and d1 == 30 else end.day
+        days = 360 * (end.year - start.year) + 30 * (end.month - start.month) + (d2 - d1)
+        return days / 360
+    raise ValueError(f"Unknown day-count convention: {convention}")
+
+
+class BankAccount:
+    # ========== STATIC ATTRIBUTES (CLASS ATTRIBUTES) ==========
+    bank_name = "Global Bank"
+    interest_rate = 0.03                          # ← STATIC: the rate in force when it was last set
+    rate_history = [(date.min, interest_rate)]    # ← STATIC: (valid from, rate), sorted by date
+    total_accounts = 0
+
+    def __init__(self, account_holder, initial_balance=0):
+        self.account_holder = account_holder
+        self.balance = initial_balance
+        BankAccount.total_accounts += 1
+
+    def calculate_interest(self):
+        """Calculate interest using the STATIC rate that is in force today"""
+        return self.balance * BankAccount.rate_on(date.today())
+
+    @classmethod
+    def set_interest_rate(cls, new_rate, valid_from=None):
+        """Class method to modify static attribute, remembering from when the new rate applies"""
+        valid_from = valid_from or date.today()
+        history = [entry for entry in cls.rate_history if entry[0] != valid_from]
+        history.append((valid_from, new_rate))
+        history.sort()
+        cls.rate_history = history
+        cls.interest_rate = cls.rate_on(date.today())  # a rate dated in the future is not in force yet
+        print(f"Interest rate updated to {new_rate * 100}% from {valid_from}")
+
+    @classmethod
+    def rate_on(cls, day):
+        """The rate in force on `day`: the latest entry of the history that is valid from that day or earlier"""
+        rate = cls.rate_history[0][1]
+        for valid_from, entry_rate in cls.rate_history:
+            if valid_from > day:
+                break
+            rate = entry_rate
+        return rate
+
+    @classmethod
+    def rate_periods(cls, start, end):
+        """Split start..end at every rate change: yields (period_start, period_end, rate)"""
+        history = cls.rate_history
+        for i, (valid_from, rate) in enumerate(history):
+            valid_to = history[i + 1][0] if i + 1 < len(history) else date.max
+            period_start, period_end = max(start, valid_from), min(end, valid_to)
+            if period_start < period_end:
+                yield period_start, period_end, rate
+
+    @classmethod
+    def accrual_factor(cls, start, end, convention="ACT/365"):
+        """The interest earned by ONE unit of money over start..end (simple interest).
+        Each piece between two rate changes contributes rate * year fraction."""
+        return sum(rate * year_fraction(period_start, period_end, convention)
+                   for period_start, period_end, rate in cls.rate_periods(start, end))
+
+    @classmethod
+    def accrue_interest(cls, balances, start, end, convention="ACT/365"):
+        """Interest for MANY balances at once. balances is any sequence of numbers
+        (ideally an array('d')); returns an array('d') with one interest value per balance."""
+        factor = cls.accrual_factor(start, end, convention)
+        return array("d", [balance * factor for balance in balances])
+
+    @classmethod
+    def accrue_accounts(cls, accounts, start, end, convention="ACT/365"):
+        """Convenience version for BankAccount objects instead of a column of balances"""
+        return cls.accrue_interest([account.balance for account in accounts], start, end, convention)
+
+
+# Example usage
+if __name__ == "__main__":
+    import time
+
+    print("=== Bulk Interest Accrual Demo ===\n")
+
+    accounts = [BankAccount("Alice Johnson", 1000), BankAccount("Bob Smith", 1500)]
+
+    # The rate changes in the MIDDLE of the accrual period
+    BankAccount.set_interest_rate(0.05, valid_from=date(2024, 7, 1))
+    start, end = date(2024, 1, 1), date(2025, 1, 1)
+
+    for period_start, period_end, rate in BankAccount.rate_periods(start, end):
+        print(f"  {period_start} .. {period_end}: {rate * 100}%")
+
+    for convention in ("ACT/365", "ACT/360", "30/360"):
+        interest = BankAccount.accrue_accounts(accounts, start, end, convention)
+        print(f"{convention:>8}: Alice ${interest[0]:.2f}, Bob ${interest[1]:.2f}")
+
+    # One account at a time vs one pass over a column of balances
+    n = 10_000_000
+    balances = array("d", range(n))
+
+    start_time = time.perf_counter()
+    interest = BankAccount.accrue_interest(balances, start, end)
+    bulk_time = time.perf_counter() - start_time
+
+    objects = [BankAccount("x", balance) for balance in balances[:100_000]]
+    start_time = time.perf_counter()
+    for account in objects:
+        account.calculate_interest()
+    object_time = (time.perf_counter() - start_time) * (n / 100_000)
+
+    print(f"\nAccrual over {n:,} balances")
+    print(f"  calculate_interest() per object (extrapolated): {object_time:.2f}s")
+    print(f"  one pass over an array of balances:             {bulk_time:.2f}s")
+    print(f"  total interest: ${sum(interest):,.2f}")
+
+# KEY INSIGHT:
+# Because interest_rate is a STATIC attribute, it is the same for every account.
+# That is exactly what makes the bulk version possible: all the date logic (rate changes,
+# day counts) is done ONCE for the class, and what is left per account is a single multiplication.
+# In pure Python the pass costs about a second for 10M balances; with a NumPy array the same
+# `balances * factor` runs in a few milliseconds, but this course sticks to the standard library.
@@ -0,0 +1,319 @@
+"""
+Persistent Account Store Example
+================================
+
+So far every BankAccount (5_static_attributes.py, 6_static_methods.py) only lives in
+memory. When the program stops, all accounts are gone and have to be rebuilt by
+calling the constructor again for every single account.
+
+This example keeps the DATA of the accounts in a file instead:
+- a MEMORY-MAPPED file of FIXED-SIZE RECORDS: record number i is always at the same
+  byte offset, so reading account i is just reading a few bytes from memory
+- a small header in the same file holds the STATIC (per-class) configuration:
+  bank_name, interest_rate and MIN_BALANCE
+- a WRITE-AHEAD LOG (WAL): every change is first appended to a log file and only then
+  applied to the mapped file. After a crash, the changes that did not make it into the
+  mapped file are replayed from the tail of the log
+- a CHECKPOINT flushes the mapped file and empties the log
+
+Starting the program is now: map the file + replay the (short) WAL tail.
+BankAccount OBJECTS are only created for the accounts you actually touch.
+"""
+
+import mmap
+import os
+import struct
+import weakref
+import zlib
+
+MAGIC = b"ACCTSTOR"
+VERSION = 1
+HEADER = struct.Struct("<8sIQQQ32sdd")  # magic, version, count, capacity, applied_lsn, bank_name, interest_rate, MIN_BALANCE
+HEADER_SIZE = 128
+RECORD = struct.Struct("<32sd")  # owner (at most 32 bytes, longer names are cut off), balance
+BALANCE = struct.Struct("<d")
+BALANCE_OFFSET = 32  # the balance starts right after the 32 bytes of the owner
+WAL_ENTRY = struct.Struct("<QBQd32s")  # lsn, operation, index, number, text
+WAL_CRC = struct.Struct("<I")
+
+OP_OPEN, OP_BALANCE, OP_BANK_NAME, OP_INTEREST_RATE, OP_MIN_BALANCE = range(1, 6)
+
+
+class AccountStore:
+    def __init__(self, path, initial_capacity=1024, sync_wal=False):
+        self.path = path
+        self.wal_path = path + ".wal"
+        self.sync_wal = sync_wal  # True -> os.fsync the WAL after every change (slow but safest)
+        self._accounts = weakref.WeakValueDictionary()  # only the materialized BankAccount objects
+
+        new_file = not os.path.exists(path)
+        self._file = open(path, "w+b" if new_file else "r+b")
+        if new_file:
+            self._file.truncate(HEADER_SIZE + initial_capacity * RECORD.size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+        if new_file:
+            self._count, self._capacity, self._applied_lsn = 0, initial_capacity, 0
+            self._config = {"bank_name": "Global Bank", "interest_rate": 0.03, "MIN_BALANCE": 100}
+            self._write_header()
+        else:
+            self._read_header()
+
+        self._wal = open(self.wal_path, "a+b")
+        self._next_lsn = self._applied_lsn + 1
+        self.replayed = self._replay_wal()
+
+    # ---------- public interface ----------
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def config(self):
+        return dict(self._config)
+
+    def open_account(self, owner, balance=0):
+        """Create a new record and return its account number (record index)"""
+        index = self._count
+        self._log(OP_OPEN, index, balance, owner)
+        return index
+
+    def owner_of(self, index):
+        self._check(index)
+        return RECORD.unpack_from(self._mm, self._offset(index))[0].rstrip(b"\0").decode("utf-8", "ignore")
+
+    def balance_of(self, index):
+        self._check(index)
+        return BALANCE.unpack_from(self._mm, self._offset(index) + BALANCE_OFFSET)[0]
+
+    def set_balance(self, index, balance):
+        self._check(index)
+        self._log(OP_BALANCE, index, balance)
+
+    def set_config(self, name, value):
+        """Change one of the STATIC settings: bank_name, interest_rate or MIN_BALANCE"""
+        if name == "bank_name":
+            self._log(OP_BANK_NAME, 0, 0, value)
+        elif name == "interest_rate":
+            self._log(OP_INTEREST_RATE, 0, value)
+        elif name == "MIN_BALANCE":
+            self._log(OP_MIN_BALANCE, 0, value)
+        else:
+            raise KeyError(name)
+
+    def account(self, index):
+        """Materialize account number `index` as a BankAccount object (only when touched)"""
+        self._check(index)
+        account = self._accounts.get(index)
+        if account is None:
+            account = BankAccount._from_store(self, index)
+            self._accounts[index] = account
+        return account
+
+    def checkpoint(self):
+        """Make the mapped file durable and start a fresh, empty WAL"""
+        self._applied_lsn = self._next_lsn - 1
+        self._write_header()
+        self._mm.flush()
+        # mmap.flush() writes the pages, fsync also makes the new file size of _grow() durable.
+        # Only then may the WAL go: until this point it is the only copy of the changes.
+        os.fsync(self._file.fileno())
+        self._wal.truncate(0)
+        self._wal.flush()
+        os.fsync(self._wal.fileno())
+
+    def close(self, checkpoint=True):
+        if checkpoint:
+            self.checkpoint()
+        self._wal.close()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    # ---------- internal helpers ----------
+
+    def _offset(self, index):
+        return HEADER_SIZE + index * RECORD.size
+
+    def _check(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(f"No account number {index}")
+
+    def _log(self, operation, index, number, text=""):
+        """Write-ahead: append to the WAL first, then apply the change to the mapped file"""
+        entry = WAL_ENTRY.pack(self._next_lsn, operation, index, number, text.encode("utf-8"))
+        self._wal.write(entry + WAL_CRC.pack(zlib.crc32(entry)))
+        self._wal.flush()
+        if self.sync_wal:
+            os.fsync(self._wal.fileno())
+        self._apply(operation, index, number, text)
+        self._next_lsn += 1
+
+    def _apply(self, operation, index, number, text):
+        if operation == OP_OPEN:
+            if index >= self._capacity:
+                self._grow()
+            RECORD.pack_into(self._mm, self._offset(index), text.encode("utf-8"), number)
+            self._count = max(self._count, index + 1)
+        elif operation == OP_BALANCE:
+            BALANCE.pack_into(self._mm, self._offset(index) + BALANCE_OFFSET, number)
+        elif operation == OP_BANK_NAME:
+            self._config["bank_name"] = text
+        elif operation == OP_INTEREST_RATE:
+            self._config["interest_rate"] = number
+        elif operation == OP_MIN_BALANCE:
+            self._config["MIN_BALANCE"] = number
+
+    def _replay_wal(self):
+        """Apply every complete WAL entry that is newer than the last checkpoint.
+        A torn or corrupt entry (a crash in the middle of a write) ends the log: it is cut off there,
+        otherwise every entry appended after it would sit behind the bad bytes and be lost at the next replay."""
+        self._wal.seek(0)
+        replayed = 0
+        good_end = 0  # the offset right after the last good entry
+        entry_size = WAL_ENTRY.size + WAL_CRC.size
+        while True:
+            raw = self._wal.read(entry_size)
+            if len(raw) < entry_size:
+                break  # end of the log (or a torn write at the very end)
+            entry, (crc,) = raw[:WAL_ENTRY.size], WAL_CRC.unpack(raw[WAL_ENTRY.size:])
+            if zlib.crc32(entry) != crc:
+                break
+            lsn, operation, index, number, text = WAL_ENTRY.unpack(entry)
+            if lsn > self._applied_lsn:
+                self._apply(operation, index, number, text.rstrip(b"\0").decode("utf-8", "ignore"))
+                replayed += 1
+            self._next_lsn = max(self._next_lsn, lsn + 1)
+            good_end += entry_size
+        if good_end != os.fstat(self._wal.fileno()).st_size:
+            self._wal.truncate(good_end)  # the WAL is opened for appending: new entries go right after good_end
+            self._wal.flush()
+            os.fsync(self._wal.fileno())
+        self._wal.seek(good_end)
+        return replayed
+
+    def _grow(self):
+        """Double the number of record slots in the file and map it again.
+        The header (count, config, ...) is only rewritten at a checkpoint: until then the WAL has it."""
+        self._capacity *= 2
+        self._mm.close()
+        self._file.truncate(HEADER_SIZE + self._capacity * RECORD.size)
+        self._mm = mmap.mmap(self._file.fileno(), 0)
+
+    def _write_header(self):
+        HEADER.pack_into(self._mm, 0, MAGIC, VERSION, self._count, self._capacity, self._applied_lsn,
+                         self._config["bank_name"].encode("utf-8"), self._config["interest_rate"],
+                         self._config["MIN_BALANCE"])
+
+    def _read_header(self):
+        magic, version, count, capacity, applied_lsn, bank_name, interest_rate, min_balance = \
+            HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.path} is not an account store")
+        # The file may have grown after the last checkpoint, so trust its size over the header
+        capacity = max(capacity, (len(self._mm) - HEADER_SIZE) // RECORD.size)
+        self._count, self._capacity, self._applied_lsn = count, capacity, applied_lsn
+        # a damaged name must not make the whole store impossible to open
+        self._config = {"bank_name": bank_name.rstrip(b"\0").decode("utf-8", "ignore"),
+                        "interest_rate": interest_rate, "MIN_BALANCE": min_balance}
+
+
+class BankAccount:
+    # ========== STATIC ATTRIBUTES (CLASS ATTRIBUTES) ==========
+    # They now live in the store's header, so they survive a restart.
+    store = None
+
+    def __init__(self, owner, balance=0):
+        self._store = BankAccount.store
+        self._index = self._store.open_account(owner, balance)
+
+    @classmethod
+    def _from_store(cls, store, index):
+        """Build the object for an EXISTING record without creating a new one"""
+        account = cls.__new__(cls)
+        account._store = store
+        account._index = index
+        return account
+
+    @property
+    def owner(self):
+        return self._store.owner_of(self._index)
+
+    @property
+    def balance(self):
+        return self._store.balance_of(self._index)
+
+    def deposit(self, amount):
+        if amount > 0:
+            self._store.set_balance(self._index, self.balance + amount)
+            print(f"Deposited ${amount}. New balance: ${self.balance}")
+        else:
+            print("Deposit amount must be positive")
+
+    def withdraw(self, amount):
+        if 0 < amount <= self.balance:
+            self._store.set_balance(self._index, self.balance - amount)
+            print(f"Withdrew ${amount}. New balance: ${self.balance}")
+        else:
+            print("Invalid withdrawal amount")
+
+    def calculate_interest(self):
+        return self.balance * BankAccount.config("interest_rate")
+
+    @classmethod
+    def config(cls, name):
+        """Read a STATIC setting (bank_name, interest_rate, MIN_BALANCE) from the store"""
+        return cls.store.config[name]
+
+    @classmethod
+    def set_interest_rate(cls, new_rate):
+        cls.store.set_config("interest_rate", new_rate)
+        print(f"Interest rate updated to {new_rate * 100}%")
+
+    @staticmethod
+    def is_valid_interest_rate(rate):
+        """Check if the given interest rate is valid (between 0 and 5%"""
+        return 0 <= rate <= 5
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+    import time
+
+    print("=== Persistent Account Store Demo ===\n")
+    path = os.path.join(tempfile.mkdtemp(), "accounts.dat")
+    n = 200_000
+
+    # First run: create the accounts (the slow, one-time part)
+    start = time.perf_counter()
+    BankAccount.store = AccountStore(path)
+    for i in range(n):
+        BankAccount.store.open_account(f"owner-{i}", 100 + i % 1000)
+    BankAccount.store.checkpoint()
+    print(f"Created {n} accounts in {time.perf_counter() - start:.2f}s")
+
+    # A few more changes AFTER the checkpoint -> they only exist in the WAL
+    alice = BankAccount("Alice", 500)
+    alice.deposit(200)
+    BankAccount.set_interest_rate(0.04)
+    BankAccount.store.close(checkpoint=False)  # simulate a crash: no final checkpoint
+
+    # Second run: map the file and replay the WAL tail
+    start = time.perf_counter()
+    BankAccount.store = AccountStore(path)
+    restart_time = time.perf_counter() - start
+    print(f"\nRestarted in {restart_time * 1000:.2f}ms, replayed {BankAccount.store.replayed} WAL entries")
+    print(f"Accounts in store: {len(BankAccount.store)}")
+    print(f"Interest rate after restart: {BankAccount.config('interest_rate') * 100}%")
+
+    # Objects are only created for the accounts we touch
+    alice = BankAccount.store.account(n)
+    print(f"{alice.owner} has ${alice.balance}, interest ${alice.calculate_interest():.2f}")
+    print(f"Same object when touched again: {BankAccount.store.account(n) is alice}")
+    print(f"Account 12345 belongs to {BankAccount.store.account(12345).owner}")
+    BankAccount.store.close()
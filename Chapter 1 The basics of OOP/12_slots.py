@@ -0,0 +1,293 @@
+"""
+__slots__ Example
+=================
+
+Every normal Python object stores its instance attributes in its own dictionary, self.__dict__.
+A dictionary is flexible (you can add any attribute at any time) but it costs memory,
+and when you create MILLIONS of objects that memory adds up.
+
+If a class declares __slots__, Python reserves a fixed place for exactly those
+attributes inside the object itself and does NOT create a __dict__.
+You lose the ability to add new attributes on the fly, but each object gets much smaller.
+
+Good to know:
+- private attributes still work: inside class User, "__password" in __slots__ is
+  name-mangled to _User__password, exactly like self.__password in a normal class
+- properties still work: they live on the CLASS, not in the instance
+- with inheritance EVERY class in the hierarchy must declare __slots__ (only its NEW
+  attributes), otherwise the subclass gets a __dict__ again
+"""
+
+import sys
+import tracemalloc
+
+
+# ============ The classes from the earlier examples ============
+
+class Dog:
+    def __init__(self, first_name, last_name, breed):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.breed = breed
+
+    def bark(self):
+        return f"{self.first_name} says Woof!"
+
+    def get_full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    def show_identity(self):
+        print(f"self is: {self}")
+        print(f"self's type: {type(self)}")
+        print(f"self's id: {id(self)}")
+        return self
+
+
+class Person:
+    def __init__(self, name, age):
+        self.name = name
+        self.age = age
+
+    def greet(self):
+        return f"Hello, my name is {self.name} and I am {self.age} years old."
+
+
+class User:
+    def __init__(self, username, email, password):
+        self.username = username
+        self.email = email
+        self.__password = password  # private attribute
+
+    @property
+    def password(self):
+        return self.__password
+
+    @password.setter
+    def password(self, new_password):
+        if len(new_password) >= 6:  # Simple validation
+            self.__password = new_password
+        else:
+            print("Password must be at least 6 characters long.")
+
+
+class BankAccount:
+    def __init__(self, balance):
+        self.__balance = balance  # Private attribute
+
+    @property
+    def balance(self):
+        return self.__balance
+
+    def deposit(self, amount):
+        if amount > 0:
+            self.__balance += amount
+
+    def withdraw(self, amount):
+        if 0 < amount <= self.__balance:
+            self.__balance -= amount
+
+
+class Vehicel:
+    def __init__(self, brand, model, year):
+        self.brand = brand
+        self.model = model
+        self.year = year
+
+    def start(self):
+        print("Vehicle is starting...")
+
+    def stop(self):
+        print("Vehicle is stopping...")
+
+
+class Car(Vehicel):
+    def __init__(self, brand, model, year, num_doors, number_of_wheels=4):
+        super().__init__(brand, model, year)
+        self.num_doors = num_doors
+        self.number_of_wheels = number_of_wheels
+
+    def open_trunk(self):
+        print("Trunk is now open.")
+
+
+class Bike(Vehicel):
+    def __init__(self, brand, model, year, number_of_wheels=2):
+        super().__init__(brand, model, year)
+        self.number_of_wheels = number_of_wheels
+
+    def kick_start(self):
+        print("Bike is kick-started.")
+
+
+# ============ The same classes in compact mode (__slots__) ============
+# Careful: a slotted class must NOT inherit from a normal class, because the normal
+# base class would give every instance a __dict__ again. That is why these are written out in full.
+
+class SlottedDog:
+    __slots__ = ("first_name", "last_name", "breed")
+
+    def __init__(self, first_name, last_name, breed):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.breed = breed
+
+    def bark(self):
+        return f"{self.first_name} says Woof!"
+
+    def get_full_name(self):
+        return f"{self.first_name} {self.last_name}"
+
+    def show_identity(self):
+        print(f"self is: {self}")
+        print(f"self's type: {type(self)}")
+        print(f"self's id: {id(self)}")
+        return self
+
+
+class SlottedPerson:
+    __slots__ = ("name", "age")
+
+    def __init__(self, name, age):
+        self.name = name
+        self.age = age
+
+    def greet(self):
+        return f"Hello, my name is {self.name} and I am {self.age} years old."
+
+
+class SlottedUser:
+    __slots__ = ("username", "email", "__password")  # "__password" is mangled to _SlottedUser__password
+
+    def __init__(self, username, email, password):
+        self.username = username
+        self.email = email
+        self.__password = password  # private attribute, now stored in a slot
+
+    @property
+    def password(self):
+        return self.__password
+
+    @password.setter
+    def password(self, new_password):
+        if len(new_password) >= 6:  # Simple validation
+            self.__password = new_password
+        else:
+            print("Password must be at least 6 characters long.")
+
+
+class SlottedBankAccount:
+    __slots__ = ("__balance",)
+
+    def __init__(self, balance):
+        self.__balance = balance  # Private attribute, now stored in a slot
+
+    @property
+    def balance(self):
+        return self.__balance
+
+    def deposit(self, amount):
+        if amount > 0:
+            self.__balance += amount
+
+    def withdraw(self, amount):
+        if 0 < amount <= self.__balance:
+            self.__balance -= amount
+
+
+class SlottedVehicel:
+    __slots__ = ("brand", "model", "year")
+
+    def __init__(self, brand, model, year):
+        self.brand = brand
+        self.model = model
+        self.year = year
+
+    def start(self):
+        print("Vehicle is starting...")
+
+    def stop(self):
+        print("Vehicle is stopping...")
+
+
+class SlottedCar(SlottedVehicel):
+    __slots__ = ("num_doors", "number_of_wheels")  # only the NEW attributes
+
+    def __init__(self, brand, model, year, num_doors, number_of_wheels=4):
+        super().__init__(brand, model, year)
+        self.num_doors = num_doors
+        self.number_of_wheels = number_of_wheels
+
+    def open_trunk(self):
+        print("Trunk is now open.")
+
+
+class SlottedBike(SlottedVehicel):
+    __slots__ = ("number_of_wheels",)
+
+    def __init__(self, brand, model, year, number_of_wheels=2):
+        super().__init__(brand, model, year)
+        self.number_of_wheels = number_of_wheels
+
+    def kick_start(self):
+        print("Bike is kick-started.")
+
+
+def bytes_per_instance(factory, n):
+    """Create n objects with tracemalloc running and return the memory per object"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [factory() for _ in range(n)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    list_overhead = sys.getsizeof(objects)
+    del objects
+    return (after - before - list_overhead) / n
+
+
+# Example usage
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    print("=== __slots__ Demo ===\n")
+    user = SlottedUser("alice", "alice@gmail.com", "alice123")
+    user.password = "123"  # the property with validation still works
+    user.password = "new-secret"
+    print(f"Password via property: {user.password}")
+    print(f"Private attribute is still name-mangled: {hasattr(user, '_SlottedUser__password')}")
+    try:
+        user.nickname = "ally"
+    except AttributeError as error:
+        print(f"Adding a new attribute fails: {error}")
+
+    account = SlottedBankAccount(1000)
+    account.deposit(500)
+    account.withdraw(200)
+    print(f"Balance via property: {account.balance}")
+
+    car = SlottedCar("Toyota", "Camry", 2020, 4)  # the slotted classes keep all their methods
+    car.start()
+    car.open_trunk()
+    SlottedBike("Honda", "CB500", 2019).kick_start()
+    print(SlottedDog("Buddy", "Smith", "Golden Retriever").get_full_name())
+
+    for obj in (user, account, SlottedCar("Toyota", "Camry", 2020, 4), Car("Toyota", "Camry", 2020, 4)):
+        print(f"{type(obj).__name__} has a __dict__: {hasattr(obj, '__dict__')}")
+
+    pairs = [
+        ("Dog", lambda: Dog("Buddy", "Smith", "Golden Retriever"),
+         lambda: SlottedDog("Buddy", "Smith", "Golden Retriever")),
+        ("Person", lambda: Person("Alice", 30), lambda: SlottedPerson("Alice", 30)),
+        ("User", lambda: User("alice", "alice@gmail.com", "alice123"),
+         lambda: SlottedUser("alice", "alice@gmail.com", "alice123")),
+        ("BankAccount", lambda: BankAccount(1000), lambda: SlottedBankAccount(1000)),
+        ("Vehicel", lambda: Vehicel("Toyota", "Camry", 2020), lambda: SlottedVehicel("Toyota", "Camry", 2020)),
+        ("Car", lambda: Car("Toyota", "Camry", 2020, 4), lambda: SlottedCar("Toyota", "Camry", 2020, 4)),
+        ("Bike", lambda: Bike("Honda", "CB500", 2019), lambda: SlottedBike("Honda", "CB500", 2019)),
+    ]
+
+    print(f"\n=== Memory per instance at {n:,} objects ===")
+    print(f"{'class':<12} {'__dict__':>10} {'__slots__':>10} {'saved':>7}")
+    for name, normal, slotted in pairs:
+        before = bytes_per_instance(normal, n)
+        after = bytes_per_instance(slotted, n)
+        print(f"{name:<12} {before:>9.0f}B {after:>9.0f}B {1 - after / before:>6.0%}")
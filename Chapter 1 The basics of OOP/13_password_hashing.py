@@ -0,0 +1,155 @@
+"""
+The password setter in 4_accessing daty.py checks the length and then stores the password AS IS.
+Passwords must never be stored like that: we store a HASH, computed with a deliberately SLOW and
+MEMORY-HARD function (scrypt), so that an attacker with a stolen database can try only a few guesses per second.
+
+Slow on purpose means slow for us too: one hash takes tens of milliseconds. Computed inside a request thread,
+every login or password change would hold up that thread. So the hashing is OFFLOADED to a pool:
+- the password setter validates, then submits the hash to the pool and stores the FUTURE (the result to come)
+- verify_password() sends the check to the pool and waits for the answer without blocking other threads
+- the cost (n, r, p) is tunable and stored inside every hash, so it can be raised later:
+  needs_rehash() tells which stored hashes still use old settings
+- migrate() hashes millions of existing plaintext passwords on all cores, chunk by chunk
+
+The stored format is "scrypt$n$r$p$salt$hash", with salt and hash in base64.
+"""
+
+import base64
+import hashlib
+import hmac
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+def hash_password(password, n=2 ** 14, r=8, p=1):
+    """scrypt with a random salt. Memory needed: about 128 * n * r bytes (16 MB with the defaults)."""
+    salt = os.urandom(16)
+    digest = hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p, maxmem=256 * n * r + 2 ** 20, dklen=32)
+    return f"scrypt${n}${r}${p}${base64.b64encode(salt).decode()}${base64.b64encode(digest).decode()}"
+
+
+def verify_password(password, encoded):
+    _, n, r, p, salt, expected = encoded.split("$")
+    n, r, p = int(n), int(r), int(p)
+    digest = hashlib.scrypt(password.encode(), salt=base64.b64decode(salt), n=n, r=r, p=p,
+                            maxmem=256 * n * r + 2 ** 20, dklen=32)
+    return hmac.compare_digest(digest, base64.b64decode(expected))  # same time for every wrong guess
+
+
+def _hash_chunk(rows, n, r, p):
+    """Runs in a worker process: one round trip for a whole chunk of passwords"""
+    return [(key, hash_password(password, n, r, p)) for key, password in rows]
+
+
+class PasswordHasher:
+    def __init__(self, n=2 ** 14, r=8, p=1, executor=None, workers=None):
+        self.n, self.r, self.p = n, r, p
+        self.workers = workers or os.cpu_count() or 1  # how many hashes run at the same time
+        self._executor = executor if executor is not None else ProcessPoolExecutor(self.workers)
+
+    def submit_hash(self, password):
+        return self._executor.submit(hash_password, password, self.n, self.r, self.p)
+
+    def submit_verify(self, password, encoded):
+        return self._executor.submit(verify_password, password, encoded)
+
+    def needs_rehash(self, encoded):
+        _, n, r, p, _, _ = encoded.split("$")
+        return (int(n), int(r), int(p)) != (self.n, self.r, self.p)
+
+    def migrate(self, rows, chunk_size=64, max_pending=None):
+        """Hash (key, plaintext password) rows in parallel; yields (key, hash) in the order of the input.
+        At most `max_pending` chunks are in flight, so a migration of millions of users uses little memory."""
+        max_pending = max_pending or 4 * self.workers
+        pending = deque()
+        chunk = []
+        for row in rows:
+            chunk.append(row)
+            if len(chunk) == chunk_size:
+                pending.append(self._executor.submit(_hash_chunk, chunk, self.n, self.r, self.p))
+                chunk = []
+                if len(pending) >= max_pending:
+                    yield from pending.popleft().result()
+        if chunk:
+            pending.append(self._executor.submit(_hash_chunk, chunk, self.n, self.r, self.p))
+        while pending:
+            yield from pending.popleft().result()
+
+    def close(self):
+        self._executor.shutdown()
+
+
+class User:
+    hasher = None  # one PasswordHasher (and so one pool) for all users: set it at startup, or get the default
+    _hasher_lock = threading.Lock()
+
+    @classmethod
+    def _get_hasher(cls):
+        """The configured hasher, or a default one created on first use"""
+        if cls.hasher is None:
+            with cls._hasher_lock:
+                if cls.hasher is None:
+                    cls.hasher = PasswordHasher()
+        return cls.hasher
+
+    def __init__(self, username, email, password):
+        self.username = username
+        self.email = email
+        self.__password = None  # a Future while the hash is computed, then the hash itself
+        self.password = password
+
+    @property
+    def password(self):
+        """The stored HASH, never the password itself"""
+        if self.__password is not None and not isinstance(self.__password, str):  # still a Future: wait for it
+            self.__password = self.__password.result()
+        return self.__password
+
+    @password.setter
+    def password(self, new_password):
+        if len(new_password) >= 6:  # Simple validation
+            self.__password = User._get_hasher().submit_hash(new_password)  # returns at once, the pool does the work
+        else:
+            print("Password must be at least 6 characters long.")
+
+    def verify_password(self, candidate):
+        if self.password is None:  # the password was rejected, so there is nothing to match
+            return False
+        return User._get_hasher().submit_verify(candidate, self.password).result()
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    User.hasher = PasswordHasher(n=2 ** 14)
+    alice = User("alice", "alice@gmail.com", "alice123")
+    print(f"Stored: {alice.password[:40]}...")
+    print(f"alice123 -> {alice.verify_password('alice123')}, wrong -> {alice.verify_password('alice124')}")
+    print(f"Needs rehash with n=2**15: {PasswordHasher(n=2 ** 15, executor=ThreadPoolExecutor(1), workers=1).needs_rehash(alice.password)}")
+    User.hasher.close()
+
+    # hashes per second against pool size (a lower cost, so the benchmark does not take minutes)
+    n_cost = int(sys.argv[1]) if len(sys.argv) > 1 else 2 ** 12
+    count = 200
+    passwords = [(i, f"password{i}") for i in range(count)]
+    print(f"\nscrypt n={n_cost}, r=8, p=1 on {os.cpu_count()} cores, {count} hashes")
+    started = time.perf_counter()
+    for _, password in passwords:
+        hash_password(password, n_cost)
+    print(f"  inline in the request thread:   {count / (time.perf_counter() - started):7.1f} hashes/s")
+    for workers in (1, 2, 4, 8):
+        hasher = PasswordHasher(n=n_cost, workers=workers)
+        list(hasher.migrate(passwords[:workers * 2], chunk_size=1))  # start the processes first
+        started = time.perf_counter()
+        migrated = list(hasher.migrate(passwords, chunk_size=8))
+        elapsed = time.perf_counter() - started
+        hasher.close()
+        print(f"  process pool, {workers} workers:       {len(migrated) / elapsed:7.1f} hashes/s")
+
+# Hashes per second can only grow up to the number of CPU cores: beyond that, more workers just take turns.
+# CPython's hashlib.scrypt releases the GIL while it works, so a ThreadPoolExecutor (pass it as `executor`) also keeps
+# other threads responsive. The process pool additionally keeps the 16 MB per hash out of the web server's process.
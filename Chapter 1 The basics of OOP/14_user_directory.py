@@ -0,0 +1,267 @@
+"""
+In 4_accessing daty.py a User can only be reached through a variable like user1 or user2,
+and sayHiToUser(user) needs the caller to already HOLD the other User object.
+A messaging system only knows a username or an email address, so it needs a DIRECTORY:
+- a dict from username to User, and a dict from NORMALIZED email (trimmed, lower case) to User:
+  both answer "who is bob?" in O(1), no matter how many users there are
+- a trie on usernames for autocomplete: "all usernames starting with 'al'"
+- username and email are DESCRIPTORS, so `user.username = "alice_wonderland"` updates every directory
+  the user is in, and is refused if the new name is already taken
+
+The trie is a BURST TRIE, to stay compact with millions of names: instead of one node per character,
+a node keeps up to BUCKET_SIZE names in a small sorted list, and only "bursts" into child nodes
+(one per next character) when that list gets too big. Most of the names live in the buckets,
+so the trie needs about one node per BUCKET_SIZE names instead of one node per character.
+"""
+
+import bisect
+
+BUCKET_SIZE = 64
+
+
+def normalize_email(email):
+    return email.strip().lower()
+
+
+class DirectoryField:
+    """A normal attribute, except that the directories the user is in are asked first and then updated"""
+
+    def __set_name__(self, owner, name):
+        self.name = name
+        self.storage_name = "_" + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance, self.storage_name)
+
+    def __set__(self, instance, value):
+        old_value = getattr(instance, self.storage_name, None)
+        directories = getattr(instance, "_directories", ())
+        for directory in directories:
+            directory._check_free(self.name, value, instance)  # refuse BEFORE anything changes
+        setattr(instance, self.storage_name, value)
+        for directory in directories:
+            directory._reindex(instance, self.name, old_value, value)
+
+
+class User:
+    username = DirectoryField()
+    email = DirectoryField()
+
+    def __init__(self, username, email, password):
+        self._directories = []
+        self.username = username
+        self.email = email
+        self.__password = password  # Private attribute
+
+    def sayHiToUser(self, user):
+        print(f"Sending message to {user.username}: Hi {user.username}, it's {self.username}!")
+
+    def __repr__(self):
+        return f"User({self.username!r}, {self.email!r})"
+
+
+class _TrieNode:
+    __slots__ = ("bucket", "children", "terminal")
+
+    def __init__(self):
+        self.bucket = []       # sorted names, while this node has not burst yet
+        self.children = None   # next character -> _TrieNode, once it has burst
+        self.terminal = None   # after the burst: the name that ends exactly at this node, if any
+
+
+class UsernameTrie:
+    def __init__(self):
+        self._root = _TrieNode()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def add(self, name):
+        node, depth = self._root, 0
+        while node.children is not None:
+            if depth == len(name):
+                node.terminal = name
+                self._size += 1
+                return
+            child = node.children.get(name[depth])
+            if child is None:
+                child = node.children[name[depth]] = _TrieNode()
+            node, depth = child, depth + 1
+        bisect.insort(node.bucket, name)
+        self._size += 1
+        if len(node.bucket) > BUCKET_SIZE:
+            self._burst(node, depth)
+
+    def remove(self, name):
+        node, depth = self._root, 0
+        while node.children is not None:
+            if depth == len(name):
+                if node.terminal != name:
+                    raise KeyError(name)
+                node.terminal = None
+                self._size -= 1
+                return
+            node, depth = node.children[name[depth]], depth + 1
+        i = bisect.bisect_left(node.bucket, name)
+        if i == len(node.bucket) or node.bucket[i] != name:
+            raise KeyError(name)
+        del node.bucket[i]
+        self._size -= 1
+
+    def complete(self, prefix, limit=10):
+        """Up to `limit` names starting with `prefix`, in alphabetical order"""
+        node, depth = self._root, 0
+        while node.children is not None and depth < len(prefix):
+            node = node.children.get(prefix[depth])
+            if node is None:
+                return []
+            depth += 1
+        result = []
+        self._collect(node, prefix, limit, result)
+        return result
+
+    def _collect(self, node, prefix, limit, result):
+        if node.children is None:
+            i = bisect.bisect_left(node.bucket, prefix)
+            bucket = node.bucket
+            while i < len(bucket) and len(result) < limit and bucket[i].startswith(prefix):
+                result.append(bucket[i])
+                i += 1
+            return
+        if node.terminal is not None and node.terminal.startswith(prefix):
+            result.append(node.terminal)
+        for char in sorted(node.children):
+            if len(result) >= limit:
+                return
+            self._collect(node.children[char], prefix, limit, result)
+
+    @staticmethod
+    def _burst(node, depth):
+        """Turn a full bucket into one child per next character. The names all share their first `depth` characters."""
+        node.children = {}
+        for name in node.bucket:  # the bucket is sorted, so every child bucket is sorted as well
+            if len(name) == depth:
+                node.terminal = name
+                continue
+            child = node.children.get(name[depth])
+            if child is None:
+                child = node.children[name[depth]] = _TrieNode()
+            child.bucket.append(name)
+        node.bucket = None
+        for child in node.children.values():
+            if len(child.bucket) > BUCKET_SIZE:  # all names shared the next character as well
+                UsernameTrie._burst(child, depth + 1)
+
+
+class UserDirectory:
+    def __init__(self, users=()):
+        self._by_username = {}
+        self._by_email = {}  # normalized email -> User
+        self._trie = UsernameTrie()
+        for user in users:
+            self.add(user)
+
+    def __len__(self):
+        return len(self._by_username)
+
+    def add(self, user: User):
+        if self._by_username.get(user.username) is user:
+            return
+        self._check_free("username", user.username, user)
+        self._check_free("email", user.email, user)
+        self._by_username[user.username] = user
+        self._by_email[normalize_email(user.email)] = user
+        self._trie.add(user.username)
+        user._directories.append(self)
+
+    def remove(self, user: User):
+        del self._by_username[user.username]
+        del self._by_email[normalize_email(user.email)]
+        self._trie.remove(user.username)
+        user._directories.remove(self)
+
+    def get(self, username):
+        """The User with this username, or None"""
+        return self._by_username.get(username)
+
+    def find_by_email(self, email):
+        return self._by_email.get(normalize_email(email))
+
+    def complete(self, prefix, limit=10):
+        """Autocomplete: the users whose username starts with `prefix`"""
+        return [self._by_username[name] for name in self._trie.complete(prefix, limit)]
+
+    def _check_free(self, field, value, user):
+        if field == "username":
+            owner = self._by_username.get(value)
+        else:
+            owner = self._by_email.get(normalize_email(value))
+        if owner is not None and owner is not user:
+            raise ValueError(f"{field} {value!r} is already taken")
+
+    def _reindex(self, user, field, old_value, new_value):
+        """Called by DirectoryField after username or email of one of our users changed"""
+        if field == "username":
+            del self._by_username[old_value]
+            self._by_username[new_value] = user
+            self._trie.remove(old_value)
+            self._trie.add(new_value)
+        else:
+            del self._by_email[normalize_email(old_value)]
+            self._by_email[normalize_email(new_value)] = user
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+
+    directory = UserDirectory([User("alice", "Alice@gmail.com", "alice123"), User("bob", "bob@gmail.com", "bob123"),
+                               User("albert", "albert@gmail.com", "albert123")])
+    directory.get("alice").sayHiToUser(directory.find_by_email("  BOB@gmail.com"))
+    print(f"Autocomplete 'al': {directory.complete('al')}")
+    directory.get("alice").username = "alice_wonderland"  # the directory follows the change
+    print(f"After renaming: get('alice') = {directory.get('alice')}, complete('ali') = {directory.complete('ali')}")
+    try:
+        directory.get("bob").username = "albert"
+    except ValueError as exc:
+        print(f"Refused: {exc}")
+
+    # A big directory: 1M users by default, `python 14_user_directory.py 10000000` for 10M (several GB of memory)
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(8)
+    syllables = ["al", "be", "ca", "do", "el", "fi", "ga", "ho", "in", "ju", "ka", "lo", "mi", "no", "or", "pa"]
+    started = time.perf_counter()
+    directory = UserDirectory()
+    for i in range(n):
+        name = "".join(rng.choice(syllables) for _ in range(3)) + str(i)
+        directory.add(User(name, f"{name}@example.com", "secret123"))
+    print(f"\nBuilt a directory of {len(directory):,} users in {time.perf_counter() - started:.1f}s")
+
+    names = list(directory._by_username)
+    clock = time.perf_counter_ns
+
+    def latencies(label, operation, keys):
+        timings = []
+        for key in keys:
+            started = clock()
+            operation(key)
+            timings.append(clock() - started)
+        timings.sort()
+        print(f"  {label:<28} p50 {timings[len(timings) // 2] / 1000:7.2f}us   "
+              f"p99 {timings[int(len(timings) * 0.99)] / 1000:7.2f}us")
+
+    lookups = 100_000
+    latencies("get(username)", directory.get, rng.choices(names, k=lookups))
+    latencies("find_by_email(email)", directory.find_by_email,
+              [f" {name.upper()}@EXAMPLE.COM" for name in rng.choices(names, k=lookups)])
+    latencies("complete(3 letters), 10", directory.complete, [name[:3] for name in rng.choices(names, k=10_000)])
+    latencies("complete(5 letters), 10", directory.complete, [name[:5] for name in rng.choices(names, k=10_000)])
+    latencies("rename (reindex)", lambda user: setattr(user, "username", user.username + "_"),
+              [directory.get(name) for name in rng.sample(names, 10_000)])
+
+# The latencies include about 0.1us for reading the clock itself.
+# A dict lookup does not depend on the number of users (only CPU caches make a huge dict a little slower).
@@ -0,0 +1,218 @@
+"""
+sayHiToUser(self, user) in 4_accessing daty.py formats ONE greeting and prints it.
+Sending the same greeting from one sender to a million recipients that way costs, per recipient:
+a method call, an f-string, and a print() that goes all the way down to the output.
+
+broadcast() does the same work in bulk:
+- the template is COMPILED once per broadcast: the sender's name is filled in up front, which leaves
+  a list of fixed text pieces with empty slots for the recipient's name
+- for a batch of recipients that list is repeated once per recipient (a buffer that is reused for every batch),
+  the names are dropped into the slots with slice assignment, and one "".join() renders the whole batch
+- the rendered batches are collected in a bytearray and written out in LARGE CHUNKS (1 MB by default)
+- where they go is decided by a pluggable SINK: a file, a socket, memory, ... (anything with write())
+"""
+
+import io
+import sys
+from abc import ABC, abstractmethod
+from itertools import islice
+from operator import attrgetter
+from string import Formatter
+
+GREETING = "Sending message to {recipient}: Hi {recipient}, it's {sender}!\n"
+
+
+class User:
+    def __init__(self, username, email, password):
+        self.username = username
+        self.email = email
+        self.__password = password  # Private attribute
+
+    def sayHiToUser(self, user):
+        print(f"Sending message to {user.username}: Hi {user.username}, it's {self.username}!")
+
+
+class GreetingTemplate:
+    """A template with {recipient} and {sender} fields, compiled once for a given sender"""
+
+    def __init__(self, template=GREETING):
+        self.pieces = list(Formatter().parse(template))  # [(literal text, field name, format spec, conversion)]
+
+    def bind(self, sender):
+        """Fill in the sender: the result only needs the recipients' names"""
+        row = [""]    # the pieces of one greeting: fixed text, with None where a recipient's name goes
+        formats = []  # per slot: None, or the format of that field, e.g. "{0!r}" or "{0:>10}"
+        for literal, field, spec, conv in self.pieces:
+            row[-1] += literal
+            if field is None:
+                continue
+            if field == "sender":
+                row[-1] += _field_format(conv, spec).format(sender)
+            elif field == "recipient":
+                formats.append(_field_format(conv, spec) if spec or conv else None)
+                row += [None, ""]
+            else:
+                raise KeyError(f"unknown template field {field!r}")
+        return _BoundTemplate(row, formats)
+
+
+def _field_format(conversion, spec):
+    """The format string for one field, e.g. "{0!r:>10}": it formats a value exactly like the template field would"""
+    return "{0" + (f"!{conversion}" if conversion else "") + (f":{spec}" if spec else "") + "}"
+
+
+class _BoundTemplate:
+    def __init__(self, row, formats):
+        self.row = row
+        self.slots = list(zip((i for i, piece in enumerate(row) if piece is None), formats))  # (index, format)
+        self._parts = []  # the reusable buffer: `row` repeated once per recipient of a batch
+
+    def render(self, names):
+        """All greetings for a batch of names, as one string. The names are put into the slots of a
+        prepared list with slice assignment, and one str.join builds the text: no per-greeting formatting at all."""
+        formatted = {None: names}  # every distinct field format is applied to the batch once
+        width = len(self.row)
+        if len(self._parts) != width * len(names):
+            self._parts = self.row * len(names)  # only when the batch size changes (the last batch)
+        parts = self._parts
+        for slot, field_format in self.slots:
+            values = formatted.get(field_format)
+            if values is None:
+                values = formatted[field_format] = list(map(field_format.format, names))
+            parts[slot::width] = values
+        return "".join(parts)
+
+
+class Sink(ABC):
+    @abstractmethod
+    def write(self, data):
+        """Take a chunk of bytes. The caller reuses the buffer afterwards, so copy it if you keep it."""
+        pass
+
+    def close(self):
+        pass
+
+
+class FileSink(Sink):
+    def __init__(self, path):
+        self._file = open(path, "wb", buffering=0)  # our chunks are already large: no second buffer needed
+        self.written = 0  # bytes
+
+    def write(self, data):
+        """A raw file may take only part of the data per call (a pipe, a signal...): write until all of it is out"""
+        view = memoryview(data)
+        while view:
+            count = self._file.write(view)
+            self.written += count
+            view = view[count:]
+
+    def close(self):
+        self._file.close()
+
+
+class SocketSink(Sink):
+    def __init__(self, sock):
+        self._sock = sock
+
+    def write(self, data):
+        self._sock.sendall(data)
+
+
+class MemorySink(Sink):
+    def __init__(self):
+        self._data = io.BytesIO()
+
+    def write(self, data):
+        self._data.write(data)
+
+    def getvalue(self):
+        return self._data.getvalue()
+
+
+class StdoutSink(Sink):
+    def write(self, data):
+        sys.stdout.flush()
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+
+
+def broadcast(sender, recipients, sink: Sink, template=None, batch=4096, chunk_bytes=1 << 20):
+    """Greet every recipient from `sender`; returns the number of greetings written"""
+    template = template or GreetingTemplate()
+    bound = template.bind(sender.username)
+    names = map(attrgetter("username"), recipients)
+    buffer = bytearray()
+    count = 0
+    while True:
+        chunk = list(islice(names, batch))
+        if not chunk:
+            break
+        count += len(chunk)
+        buffer += bound.render(chunk).encode()
+        if len(buffer) >= chunk_bytes:
+            sink.write(buffer)
+            del buffer[:]
+    if buffer:
+        sink.write(buffer)
+    return count
+
+
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import socket
+    import threading
+    import time
+
+    alice = User("alice", "alice@gmailcom", "alice123")
+    bob = User("bob", "bob@gmailcom", "bob123")
+    alice.sayHiToUser(bob)
+    broadcast(alice, [bob, User("carol", "carol@gmailcom", "carol123")], StdoutSink())
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    recipients = [User(f"user{i}", f"user{i}@example.com", "secret123") for i in range(n)]
+    print(f"\nGreeting {n:,} recipients")
+
+    def report(label, elapsed, size=None):
+        extra = f", {size / elapsed / 1e6:6.1f} MB/s" if size else ""
+        print(f"  {label:<34} {elapsed:6.2f}s, {n / elapsed:12,.0f} greetings/s{extra}")
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        for recipient in recipients:
+            alice.sayHiToUser(recipient)
+        per_call = time.perf_counter() - started
+    report("sayHiToUser() -> print()", per_call)
+
+    memory = MemorySink()
+    started = time.perf_counter()
+    broadcast(alice, recipients, memory)
+    report("broadcast -> MemorySink", time.perf_counter() - started, len(memory.getvalue()))
+
+    sink = FileSink(os.devnull)
+    started = time.perf_counter()
+    broadcast(alice, recipients, sink)
+    report("broadcast -> FileSink(/dev/null)", time.perf_counter() - started, sink.written)
+    sink.close()
+
+    sender_socket, receiver_socket = socket.socketpair()
+    received = []
+
+    def drain():
+        total = 0
+        while data := receiver_socket.recv(1 << 20):
+            total += len(data)
+        received.append(total)
+
+    reader = threading.Thread(target=drain)
+    reader.start()
+    started = time.perf_counter()
+    broadcast(alice, recipients, SocketSink(sender_socket))
+    sender_socket.shutdown(socket.SHUT_WR)
+    reader.join()
+    report("broadcast -> SocketSink", time.perf_counter() - started, received[0])
+    first_line = memory.getvalue().splitlines()[0].decode()
+    print(f"  first greeting: {first_line!r}")
+
+# The gain comes from two things: NOT calling print() a million times (print() looks up sys.stdout, writes
+# the text and the newline separately, through the text layer), and NOT formatting a million strings one by one.
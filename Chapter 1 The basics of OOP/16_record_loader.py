@@ -0,0 +1,255 @@
+"""
+Dog (1_Objects.py) and Person (3_class example.py) can only be created by calling the constructor by hand,
+and Dog.__init__ even PRINTS its own identity for every dog: loading ten million dogs means ten million prints.
+
+A RecordLoader creates the objects straight from a CSV or JSONL file:
+- the file is read in CHUNKS of `chunk_size` rows; only one chunk is in memory at a time,
+  so the peak memory is the same for a file of a thousand rows and for one of a hundred million
+- the objects are built WITHOUT calling __init__: a small BUILDER function, generated once per class,
+  creates an empty object with cls.__new__(cls) and only sets the attributes. __init__'s print does not run,
+  so the loader checks itself that every row has exactly the fields __init__ would set.
+  This is only done when __init__ does nothing else than `self.x = x` for every parameter (and print).
+  As soon as it validates, derives values or stores a parameter under another name
+  (Owner(contact_number) -> self.phone_number), the loader simply calls the class
+- run_pipeline() chains generators: read rows -> build objects -> call a method (bark, greet, get_full_name)
+  -> write the results to another file, again chunk by chunk
+"""
+
+import ast
+import csv
+import inspect
+import json
+import textwrap
+from itertools import islice, starmap
+
+
+class Dog:
+    def __init__(self, first_name, last_name, breed):
+        self.first_name = first_name
+        self.last_name = last_name
+        self.breed = breed
+        print(f"Inside __init__, self is: {self}")
+
+    def bark(self):
+        return f"{self.first_name} says Woof!"
+
+    def get_full_name(self):
+        return f"{self.first_name} "" {self.last_name}"
+
+
+class Person:
+    def __init__(self, name, age):
+        self.name = name
+        self.age = age
+
+    def greet(self):
+        return f"Hello, my name is {self.name} and I am {self.age} years old."
+
+
+class RecordLoader:
+    def __init__(self, cls, converters=None, chunk_size=10_000):
+        self.cls = cls
+        # the attributes are the parameters of __init__ (without self), e.g. ("first_name", "last_name", "breed")
+        parameters = list(inspect.signature(cls.__init__).parameters.values())[1:]
+        unsupported = [p.name for p in parameters if p.kind is not inspect.Parameter.POSITIONAL_OR_KEYWORD]
+        if unsupported:  # *args, **kwargs and keyword-only parameters have no column of their own
+            raise TypeError(f"{cls.__name__}.__init__ can only have plain parameters, not {unsupported}")
+        self.fields = tuple(p.name for p in parameters)
+        self.converters = converters or {}  # field -> function, e.g. {"age": int}
+        self.chunk_size = chunk_size
+        # the generated builder only when it does exactly what __init__ does, otherwise the class itself
+        self._build = _make_builder(cls, self.fields) if _init_only_stores_fields(cls, self.fields) else cls
+
+    def load(self, path):
+        """All objects of a file, one after the other"""
+        for chunk in self.load_chunks(path):
+            yield from chunk
+
+    def load_chunks(self, path):
+        """Lists of at most chunk_size objects"""
+        rows = self._read_jsonl(path) if str(path).endswith((".jsonl", ".ndjson")) else self._read_csv(path)
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                return
+            yield list(starmap(self._build, chunk))  # the loop over the rows runs in C
+
+    def _read_csv(self, path):
+        """Rows as lists of values in the order of __init__'s parameters. Empty lines are skipped.
+        The header line must name exactly the fields of __init__, in any order."""
+        with open(path, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            header = tuple(next(reader, ()))
+            self._check_fields(header, path)
+            width = len(header)
+            order = [header.index(name) for name in self.fields]
+            converters = [(self.fields.index(name), convert) for name, convert in self.converters.items()]
+            reorder = order != list(range(len(order)))
+            for row in reader:
+                if len(row) != width:
+                    if not row:
+                        continue  # an empty line
+                    raise ValueError(f"{path}:{reader.line_num}: expected {width} values, got {len(row)}")
+                if reorder:  # the fast path yields the row as it is: it already is what the builder needs
+                    row = [row[i] for i in order]
+                if converters:
+                    self._convert(row, converters, f"{path}:{reader.line_num}")
+                yield row
+
+    def _read_jsonl(self, path):
+        """Rows from one JSON object per line. Blank lines are skipped."""
+        converters = [(self.fields.index(name), convert) for name, convert in self.converters.items()]
+        fields = set(self.fields)
+        with open(path, encoding="utf-8") as file:
+            for line, text in enumerate(file, start=1):
+                if text.isspace():
+                    continue
+                try:
+                    values = json.loads(text)
+                except json.JSONDecodeError as exc:
+                    raise ValueError(f"{path}:{line}: not valid JSON ({exc})") from exc
+                if not isinstance(values, dict) or values.keys() != fields:
+                    self._check_fields(tuple(values) if isinstance(values, dict) else (), f"{path}:{line}")
+                row = [values[name] for name in self.fields]
+                if converters:
+                    self._convert(row, converters, f"{path}:{line}")
+                yield row
+
+    def _convert(self, row, converters, where):
+        for i, convert in converters:
+            try:
+                row[i] = convert(row[i])
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"{where}: bad value for {self.fields[i]}: {row[i]!r} ({exc})") from exc
+
+    def _check_fields(self, names, where):
+        if set(names) != set(self.fields) or len(names) != len(self.fields):
+            raise ValueError(f"{where}: {self.cls.__name__} needs the fields {self.fields}, got {tuple(names)}")
+
+
+def _init_only_stores_fields(cls, fields):
+    """True if cls.__init__ is nothing but `self.<field> = <field>` once for every field, plus prints and a docstring.
+    Anything else (an if, a raise, self.phone_number = contact_number, super().__init__()...) -> False.
+    So is an __init__ whose source cannot be read (a builtin, a class made in the interactive shell)."""
+    try:
+        source = textwrap.dedent(inspect.getsource(cls.__init__))
+    except (OSError, TypeError):
+        return False
+    function = ast.parse(source).body[0]
+    if not isinstance(function, ast.FunctionDef) or not function.args.args:  # e.g. __init__ = some_other_function
+        return False
+    self_name = function.args.args[0].arg
+    stored = []
+    for statement in function.body:
+        if isinstance(statement, ast.Expr) and (
+                isinstance(statement.value, ast.Constant)  # the docstring
+                or isinstance(statement.value, ast.Call) and isinstance(statement.value.func, ast.Name)
+                and statement.value.func.id == "print"):
+            continue
+        if not (isinstance(statement, ast.Assign) and len(statement.targets) == 1):
+            return False
+        target, value = statement.targets[0], statement.value
+        if not (isinstance(target, ast.Attribute) and isinstance(target.value, ast.Name)
+                and target.value.id == self_name and isinstance(value, ast.Name) and value.id == target.attr):
+            return False
+        stored.append(target.attr)
+    return sorted(stored) == sorted(fields)
+
+
+def _make_builder(cls, fields):
+    """Generate `def build(first_name, last_name, breed)` that creates a cls WITHOUT running __init__.
+    It is generated (like namedtuple and dataclasses do) so that setting the attributes costs no loop at all.
+    The builder's own names get underscores until they differ from every field, so a field called obj or cls works."""
+    obj, new, klass = (_free_name(name, fields) for name in ("_obj", "_new", "_cls"))
+    lines = [f"def build({', '.join(fields)}):", f"    {obj} = {new}({klass})"]
+    lines += [f"    {obj}.{name} = {name}" for name in fields]
+    lines.append(f"    return {obj}")
+    namespace = {new: object.__new__, klass: cls}
+    exec("\n".join(lines), namespace)
+    return namespace["build"]
+
+
+def _free_name(name, fields):
+    while name in fields:
+        name += "_"
+    return name
+
+
+def run_pipeline(loader: RecordLoader, source, method_name, destination):
+    """Call `method_name` on every object of `source` and write one result per line to `destination`.
+    Every stage is a generator, so only one chunk is in memory at any time. Returns the number of lines written."""
+    method = getattr(loader.cls, method_name)
+    written = 0
+    with open(destination, "w", encoding="utf-8") as out:
+        for chunk in loader.load_chunks(source):
+            out.write("\n".join(map(method, chunk)))
+            out.write("\n")
+            written += len(chunk)
+    return written
+
+
+if __name__ == "__main__":
+    import contextlib
+    import os
+    import random
+    import sys
+    import tempfile
+    import time
+    import tracemalloc
+
+    folder = tempfile.mkdtemp()
+    people = os.path.join(folder, "people.jsonl")
+    with open(people, "w", encoding="utf-8") as file:
+        file.write('{"name": "Alice", "age": "30"}\n{"name": "Bob", "age": "25"}\n')
+    for person in RecordLoader(Person, converters={"age": int}).load(people):
+        print(person.greet())
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(6)
+    first_names = ["Buddy", "Max", "Bella", "Charlie", "Luna", "Rocky", "Daisy"]
+    breeds = ["Golden Retriever", "Beagle", "Poodle", "Bulldog", "Labrador"]
+    dogs_csv = os.path.join(folder, "dogs.csv")
+    dogs_jsonl = os.path.join(folder, "dogs.jsonl")
+    with open(dogs_csv, "w", newline="", encoding="utf-8") as csv_file, \
+            open(dogs_jsonl, "w", encoding="utf-8") as jsonl_file:
+        writer = csv.writer(csv_file)
+        writer.writerow(["first_name", "last_name", "breed"])
+        for i in range(n):
+            row = [rng.choice(first_names), f"Smith{i}", rng.choice(breeds)]
+            writer.writerow(row)
+            jsonl_file.write(json.dumps(dict(zip(["first_name", "last_name", "breed"], row))) + "\n")
+    print(f"\nLoading {n:,} dogs")
+
+    loader = RecordLoader(Dog)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        started = time.perf_counter()
+        with open(dogs_csv, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader)
+            for first_name, last_name, breed in reader:
+                Dog(first_name, last_name, breed)
+        print_time = time.perf_counter() - started
+    print(f"  Dog(...) per row, __init__ prints:  {print_time:6.2f}s (into /dev/null: a terminal is much slower)")
+
+    for path in (dogs_csv, dogs_jsonl):
+        started = time.perf_counter()
+        count = sum(len(chunk) for chunk in loader.load_chunks(path))
+        print(f"  RecordLoader, {os.path.basename(path):<10}            {time.perf_counter() - started:6.2f}s ({count:,} dogs)")
+
+    started = time.perf_counter()
+    written = run_pipeline(loader, dogs_csv, "bark", os.path.join(folder, "barks.txt"))
+    print(f"  pipeline csv -> bark() -> file:     {time.perf_counter() - started:6.2f}s ({written:,} lines)")
+
+    # The peak memory does not depend on the size of the file (tracemalloc is slow: measured on parts of the file)
+    for rows in (n // 10, n // 2):
+        part = os.path.join(folder, f"part{rows}.csv")
+        with open(dogs_csv, encoding="utf-8") as source, open(part, "w", encoding="utf-8") as target:
+            target.writelines(islice(source, rows + 1))
+        tracemalloc.start()
+        run_pipeline(loader, part, "get_full_name", os.path.join(folder, "names.txt"))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        print(f"  peak memory of the pipeline for {rows:>9,} rows: {peak / 1e6:5.1f} MB")
+
+# Skipping __init__ is only safe because the loader checks the fields itself and because it is only done for an __init__
+# that does nothing but set its parameters. Any other class is built by calling it: correct, just not as fast.
@@ -0,0 +1,271 @@
+"""
+Dog.show_identity() in 1_Objects.py prints id(self), and BankAccount.total_accounts in 5_static_attributes.py
+counts how many accounts were EVER created. Neither says how many objects are still ALIVE, or how much memory
+they hold, which is what you want to know when a long-running program keeps growing.
+
+An InstanceTracker answers that, for the classes you mark with @tracker.track:
+- live instances are kept through WEAK REFERENCES, one registry per class: a weak reference does not keep the
+  object alive, so an object disappears from the registry as soon as the program drops it
+- report() gives the live count and the DEEP size per class (the object, its attributes, their contents, ...)
+- with trace_allocations=True it remembers WHERE (file:line) each live object was created,
+  and starts tracemalloc so that snapshots can show which lines allocated the memory
+- snapshot() records the state at one moment, diff() compares two snapshots, and both export to plain dicts (JSON)
+
+Zero overhead when disabled: @tracker.track only writes the class into a list. enable() wraps the __init__ of the
+tracked classes and disable() puts the original __init__ back, so while the tracker is off the classes are exactly
+the classes you wrote. It can stay in production code and be switched on when needed.
+"""
+
+import gc
+import sys
+import time
+import tracemalloc
+import types
+import weakref
+from collections import Counter
+
+_NOT_COUNTED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+class LiveInstances:
+    """The live instances of one class, by identity (a WeakSet would use __eq__/__hash__, which classes may override)"""
+
+    def __init__(self):
+        self._refs = {}  # id(obj) -> (weak reference, creation site or None)
+
+        def forget(ref, refs=self._refs):  # called by Python when an object dies
+            refs.pop(ref.key, None)
+
+        self._forget = forget
+
+    def __len__(self):
+        return len(self._refs)
+
+    def add(self, obj, site=None):
+        self._refs[id(obj)] = (weakref.KeyedRef(obj, self._forget, id(obj)), site)
+
+    def objects(self):
+        return [obj for obj in (ref() for ref, _ in list(self._refs.values())) if obj is not None]
+
+    def sites(self):
+        return [site for _, site in list(self._refs.values())]
+
+
+class InstanceTracker:
+    def __init__(self):
+        self.enabled = False
+        self._classes = []
+        self._live = {}       # class -> LiveInstances (only the instances created while enabled)
+        self._originals = {}  # class -> the __init__ it had before enable() (None: it had none of its own)
+        self._init_codes = set()  # code objects of the installed wrappers and of the __init__s they call
+        self._trace = False
+        self._started_tracemalloc = False
+
+    def track(self, cls):
+        """Class decorator: mark a class for tracking. Costs nothing until enable()."""
+        self._classes.append(cls)
+        if self.enabled:
+            self._install(cls)
+        return cls
+
+    def enable(self, trace_allocations=False, frames=1):
+        if self.enabled:
+            return
+        if trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+            self._started_tracemalloc = True
+        self._trace = trace_allocations
+        self.enabled = True
+        for cls in self._classes:
+            self._install(cls)
+
+    def disable(self):
+        """Give every class its original __init__ back and forget the instances"""
+        for cls, original in self._originals.items():
+            if original is None:
+                del cls.__init__
+            else:
+                cls.__init__ = original
+        self._originals.clear()
+        self._init_codes.clear()
+        self._live.clear()
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+        self._trace = False
+        self.enabled = False
+
+    def live_count(self, cls):
+        return len(self._live.get(cls, ()))
+
+    def report(self, deep=True, sites=3):
+        """{class name: {"count": live instances, "bytes": deep size, "sites": [(file:line, count), ...]}}"""
+        result = {}
+        for cls, instances in list(self._live.items()):
+            objects = instances.objects()
+            entry = {"count": len(objects)}
+            if deep:
+                entry["bytes"] = deep_size(objects)
+            if sites and self._trace:
+                entry["sites"] = Counter(instances.sites()).most_common(sites)
+            result[cls.__qualname__] = entry
+        return result
+
+    def snapshot(self, deep=True):
+        return InstanceSnapshot(self.report(deep=deep, sites=0),
+                                tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None)
+
+    def _install(self, cls):
+        if cls in self._originals:
+            return
+        self._originals[cls] = cls.__dict__.get("__init__")
+        resolved_init = cls.__init__  # its own __init__ or the inherited one
+        live = self._live
+        trace = self._trace
+        init_codes = self._init_codes
+
+        def __init__(self, *args, **kwargs):
+            resolved_init(self, *args, **kwargs)
+            instances = live.get(type(self))
+            if instances is None:
+                instances = live[type(self)] = LiveInstances()
+            site = None
+            if trace:  # the caller of the outermost tracked __init__ (a subclass __init__ calls its parent's)
+                frame = sys._getframe(1)
+                while frame.f_back is not None and _initializes(frame, self, init_codes):
+                    frame = frame.f_back
+                site = f"{frame.f_code.co_filename}:{frame.f_lineno}"
+            try:
+                instances.add(self, site)  # keyed by id: counted by a subclass AND its parent, it is still one entry
+            except TypeError:
+                pass  # a class with __slots__ but no __weakref__ cannot be tracked
+
+        __init__.__wrapped__ = resolved_init
+        init_codes.add(__init__.__code__)
+        if hasattr(resolved_init, "__code__"):  # not for object.__init__
+            init_codes.add(resolved_init.__code__)
+        cls.__init__ = __init__
+
+
+def _initializes(frame, obj, init_codes):
+    """True for a frame of a tracked __init__ running for obj itself. Car.__init__ creating an Engine
+    is running for the car, so for the engine that frame is the creation site."""
+    code = frame.f_code
+    return code in init_codes and code.co_argcount > 0 and frame.f_locals.get(code.co_varnames[0]) is obj
+
+
+class InstanceSnapshot:
+    def __init__(self, classes, memory_snapshot=None):
+        self.taken_at = time.time()
+        self.classes = classes                  # as returned by InstanceTracker.report()
+        self.memory_snapshot = memory_snapshot  # a tracemalloc.Snapshot, if allocations are traced
+
+    def to_dict(self):
+        return {"taken_at": self.taken_at, "classes": self.classes}
+
+
+def diff(older: InstanceSnapshot, newer: InstanceSnapshot, top=5):
+    """What changed between two snapshots, as a plain dict (ready for json.dumps)"""
+    changes = {}
+    for name in sorted(older.classes.keys() | newer.classes.keys()):
+        before = older.classes.get(name, {})
+        after = newer.classes.get(name, {})
+        changes[name] = {key: after.get(key, 0) - before.get(key, 0) for key in ("count", "bytes")}
+    result = {"seconds": newer.taken_at - older.taken_at, "classes": changes}
+    if older.memory_snapshot is not None and newer.memory_snapshot is not None:
+        statistics = newer.memory_snapshot.compare_to(older.memory_snapshot, "lineno")
+        result["top_allocations"] = [{"site": str(stat.traceback[0]), "size_diff": stat.size_diff,
+                                      "count_diff": stat.count_diff} for stat in statistics[:top]]
+    return result
+
+
+def deep_size(objects):
+    """Bytes of the objects and everything they reference (each object counted once).
+    Classes, modules and functions are shared by the whole program and are not counted.
+    gc.get_referents() is used instead of __dict__, which would create a dict for objects that do not have one yet."""
+    seen = set()
+    total = 0
+    stack = list(objects)
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _NOT_COUNTED):
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        stack.extend(gc.get_referents(obj))
+    return total
+
+
+if __name__ == "__main__":
+    import json
+
+    tracker = InstanceTracker()
+
+    @tracker.track
+    class Dog:
+        def __init__(self, first_name, last_name, breed):
+            self.first_name = first_name
+            self.last_name = last_name
+            self.breed = breed
+
+        def show_identity(self):
+            print(f"self is: {self}")
+            print(f"self's id: {id(self)}")
+            return self
+
+    @tracker.track
+    class BankAccount:
+        bank_name = "Global Bank"
+        total_accounts = 0
+
+        def __init__(self, account_holder, initial_balance=0):
+            self.account_holder = account_holder
+            self.balance = initial_balance
+            self.history = []
+            BankAccount.total_accounts += 1
+
+    tracker.enable(trace_allocations=True)
+    dogs = [Dog("Buddy", "Smith", "Golden Retriever"), Dog("Max", "Jones", "Beagle")]
+    accounts = [BankAccount(f"holder{i}", i) for i in range(1000)]
+    before = tracker.snapshot()
+
+    for account in accounts[:400]:
+        account.history.extend(range(50))  # the remaining accounts grow...
+    del accounts[400:]                     # ...and 600 accounts are dropped
+    dogs.append(Dog("Bella", "Brown", "Poodle"))
+
+    print(f"BankAccount.total_accounts (ever created): {BankAccount.total_accounts}, "
+          f"alive: {tracker.live_count(BankAccount)}")
+    print(json.dumps(tracker.report(), indent=2))
+    print(json.dumps(diff(before, tracker.snapshot()), indent=2))
+    tracker.disable()
+
+    # Overhead of creating objects with the tracker off and on (best of 5 runs of 200k objects)
+    class PlainBankAccount:
+        def __init__(self, account_holder, initial_balance=0):
+            self.account_holder = account_holder
+            self.balance = initial_balance
+            self.history = []
+            BankAccount.total_accounts += 1
+
+    def per_object(cls, n=200_000):
+        best = float("inf")
+        for _ in range(5):
+            gc.collect()
+            started = time.perf_counter()
+            keep = [cls("holder", 100) for _ in range(n)]
+            best = min(best, (time.perf_counter() - started) / n * 1e9)
+            del keep
+        return best
+
+    print("\nCreating objects:")
+    print(f"  class never tracked:         {per_object(PlainBankAccount):6.0f}ns per object")
+    print(f"  @track, tracker disabled:    {per_object(BankAccount):6.0f}ns per object (the class is untouched)")
+    tracker.enable()
+    print(f"  tracker enabled:             {per_object(BankAccount):6.0f}ns per object")
+    tracker.disable()
+    tracker.enable(trace_allocations=True)
+    print(f"  enabled, trace_allocations:  {per_object(BankAccount):6.0f}ns per object (tracemalloc is the big part)")
+    tracker.disable()
+
+# Only instances created while the tracker is enabled are counted: switch it on, let the program run, compare snapshots.
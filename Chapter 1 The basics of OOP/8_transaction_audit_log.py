@@ -0,0 +1,259 @@
+"""
+Transaction Audit Log Example
+=============================
+
+In the BankAccount examples so far the only record of a transaction is a print().
+print() is a SYNCHRONOUS write to stdout: the deposit has to wait until the text is written.
+Under load that write costs more than the arithmetic of the deposit itself.
+
+In this example the protected _log_transaction hook (see 7_protectedAndPrivateMethods.py)
+hands every transaction to an AuditLog object instead:
+- the record is appended to an in-memory RING BUFFER (fast, no I/O on the caller's thread)
+- a BACKGROUND WRITER thread drains the buffer and appends the records to a JSONL file
+- many records are written with ONE write call (this is called "group commit")
+- the FSYNC POLICY decides how durable each group is:
+    "always"   -> os.fsync after every group (safest, slowest)
+    "interval" -> os.fsync at most every fsync_interval seconds
+    "never"    -> leave it to the operating system (fastest)
+- read_audit_log() streams the records back, for example to replay them after a restart
+"""
+
+import json
+import os
+import threading
+import time
+
+FSYNC_POLICIES = ("always", "interval", "never")
+
+
+class AuditLog:
+    def __init__(self, path, capacity=65536, group_size=1024, flush_interval=0.05,
+                 fsync_policy="interval", fsync_interval=1.0):
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"fsync_policy must be one of {FSYNC_POLICIES}")
+        self.path = path
+        self.capacity = capacity              # size of the ring buffer
+        self.group_size = group_size          # wake the writer as soon as this many records wait
+        self.flush_interval = flush_interval  # ...or after this many seconds, whatever comes first
+        self.fsync_policy = fsync_policy
+        self.fsync_interval = fsync_interval
+
+        # The ring buffer: a fixed list of slots plus a head (next slot to write) and a tail (next slot to read)
+        self._slots = [None] * capacity
+        self._head = 0  # total number of records appended so far
+        self._tail = 0  # total number of records handed to the file so far
+        self._durable = 0  # total number of records written (and fsynced according to the policy)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error = None   # the exception that stopped the writer, raised again to every caller
+        self._dirty = False  # written but not fsynced yet
+
+        _trim_torn_tail(path)  # otherwise our first record would be glued onto a half-written line
+        self._file = open(path, "ab")  # append-only
+        self._last_fsync = time.monotonic()
+        self._writer = threading.Thread(target=self._run_writer, name="audit-log-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, record):
+        """Put one record (a dict) into the ring buffer and return its sequence number.
+        The caller only blocks if the buffer is full (backpressure), never on disk I/O."""
+        with self._cond:
+            self._raise_error()
+            if self._closed:
+                raise ValueError("append to a closed AuditLog")
+            while self._head - self._tail >= self.capacity:
+                self._cond.wait()
+                self._raise_error()
+            seq = self._head
+            self._slots[seq % self.capacity] = record
+            self._head += 1
+            if self._head - self._tail == self.group_size:
+                self._cond.notify_all()
+            return seq
+
+    def flush(self):
+        """Block until every record appended so far has been written to the file"""
+        with self._cond:
+            target = self._head
+            self._cond.notify_all()
+            while self._durable < target:
+                self._raise_error()
+                self._cond.wait()
+            self._raise_error()
+
+    def close(self):
+        """Write everything that is still buffered, stop the writer and close the file"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._writer.join()
+        self._file.close()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _run_writer(self):
+        """Background thread: drain the ring buffer in groups and append them to the file"""
+        while True:
+            with self._cond:
+                if self._head - self._tail < self.group_size and not self._closed:
+                    self._cond.wait(self.flush_interval)
+                start, end = self._tail, self._head
+                group = [self._slots[seq % self.capacity] for seq in range(start, end)]
+                for seq in range(start, end):
+                    self._slots[seq % self.capacity] = None
+                self._tail = end
+                self._cond.notify_all()  # appenders waiting for free slots can continue
+                closed = self._closed
+
+            try:
+                if group:
+                    # One write call for the whole group: this is the group commit
+                    lines = "".join(json.dumps(record, separators=(",", ":")) + "\n" for record in group)
+                    self._file.write(lines.encode("utf-8"))
+                    self._file.flush()
+                    self._dirty = True
+                if self._dirty:  # an idle log has nothing to fsync
+                    self._sync(force=closed)
+            except Exception as exc:  # e.g. a record json cannot serialize, or a full disk
+                with self._cond:
+                    self._error = exc
+                    self._cond.notify_all()  # nobody may keep waiting for a writer that is gone
+                return
+
+            with self._cond:
+                self._durable = end
+                self._cond.notify_all()
+            if closed and end == self._head:
+                return
+
+    def _sync(self, force=False):
+        """Apply the fsync policy"""
+        if self.fsync_policy == "never":
+            return
+        now = time.monotonic()
+        if force or self.fsync_policy == "always" or now - self._last_fsync >= self.fsync_interval:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+            self._dirty = False
+
+    def _raise_error(self):
+        """Called with the lock held: fail instead of waiting forever for a dead writer"""
+        if self._error is not None:
+            raise self._error
+
+
+def _trim_torn_tail(path, block_size=4096):
+    """Cut a half-written last line (a crash in the middle of a write) back to the last complete record"""
+    if not os.path.exists(path):
+        return
+    with open(path, "r+b") as log_file:
+        end = log_file.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - block_size)
+            log_file.seek(start)
+            newline = log_file.read(position - start).rfind(b"\n")
+            if newline != -1:
+                keep = start + newline + 1
+                break
+            position = start
+        else:
+            keep = 0  # not one complete line in the file
+        if keep != end:
+            log_file.truncate(keep)
+
+
+def read_audit_log(path):
+    """Stream the records of an audit log back, one dict at a time.
+    A half-written last line (e.g. after a crash) is skipped instead of raising."""
+    with open(path, "rb") as log_file:
+        for line in log_file:
+            if not line.endswith(b"\n"):
+                break  # torn write at the end of the file
+            yield json.loads(line)
+
+
+class BankAccount:
+    def __init__(self, account_holder, audit_log, initial_balance=0):
+        self.account_holder = account_holder
+        self._balance = initial_balance  # Protected attribute
+        self._audit_log = audit_log      # Protected attribute: where our transactions are recorded
+
+    @property
+    def balance(self):
+        return self._balance
+
+    def _is_valid_amount(self, amount):
+        """Protected method to check if the amount is valid (greater than 0)"""
+        return amount > 0
+
+    def deposit(self, amount):
+        """Public method to deposit money into the account"""
+        if self._is_valid_amount(amount):
+            self._balance += amount
+            self._log_transaction(amount, "Deposit")
+            return True
+        return False
+
+    def withdraw(self, amount):
+        """Public method to withdraw money from the account"""
+        if self._is_valid_amount(amount) and amount <= self._balance:
+            self._balance -= amount
+            self._log_transaction(amount, "Withdrawal")
+            return True
+        return False
+
+    def _log_transaction(self, amount, transaction_type):
+        """Protected method to log transactions: hand them to the audit log instead of printing"""
+        self._audit_log.append({
+            "time": time.time(),
+            "account": self.account_holder,
+            "type": transaction_type,
+            "amount": amount,
+            "balance": self._balance,
+        })
+
+
+# Example usage
+if __name__ == "__main__":
+    import tempfile
+
+    print("=== Audit Log Demo ===\n")
+    log_path = os.path.join(tempfile.mkdtemp(), "audit.jsonl")
+
+    with AuditLog(log_path, fsync_policy="interval") as audit_log:
+        account = BankAccount("Alice Johnson", audit_log, 1000)
+        account.deposit(500)
+        account.withdraw(200)
+        account.withdraw(5000)  # rejected -> nothing is logged
+
+        # Many transactions: the caller never waits for the disk
+        n = 200_000
+        start = time.perf_counter()
+        for _ in range(n):
+            account.deposit(1)
+        append_time = time.perf_counter() - start
+        audit_log.flush()
+        flush_time = time.perf_counter() - start
+
+    print(f"{n} deposits logged: {append_time:.3f}s on the caller's thread, {flush_time:.3f}s until everything was on disk")
+
+    # Replay: rebuild the balance from the log alone
+    replayed = 0
+    balance = 1000
+    for record in read_audit_log(log_path):
+        balance += record["amount"] if record["type"] == "Deposit" else -record["amount"]
+        replayed += 1
+    print(f"Replayed {replayed} records, balance {balance} (account says {account.balance})")
+
+    print("\nKEY INSIGHT:")
+    print("• The public interface (deposit/withdraw) did not change at all")
+    print("• Only the protected _log_transaction method knows HOW transactions are recorded")
+    print("• That is why protected methods are a good place for implementation details like logging")
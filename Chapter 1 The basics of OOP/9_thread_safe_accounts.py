@@ -0,0 +1,210 @@
+"""
+Thread-Safe Accounts Example
+============================
+
+In 5_static_attributes.py, deposit() does `self.balance += amount` and __init__ does
+`BankAccount.total_accounts += 1`. Both are READ-MODIFY-WRITE operations:
+read the value, compute the new one, write it back. If two threads do this at the
+same time, one of the two updates can get lost.
+
+The simple fix is one big lock around everything, but then ALL accounts wait for
+each other, even accounts that have nothing to do with each other.
+
+This example shows two classic techniques instead:
+- LOCK STRIPING: a fixed set of locks ("stripes"); each account always uses the same
+  stripe, so two accounts only wait for each other if they happen to share a stripe
+- SHARDED COUNTER: every thread increments its OWN counter cell (no lock needed,
+  nobody else writes it) and reading the total means summing all cells
+"""
+
+import itertools
+import threading
+
+
+class StripedLock:
+    """A fixed pool of locks. Keys are spread over the stripes round-robin."""
+
+    def __init__(self, stripes=64):
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+    def __len__(self):
+        return len(self._locks)
+
+    def lock_for(self, key):
+        return self._locks[key % len(self._locks)]
+
+
+class ShardedCounter:
+    """A counter where every thread owns one cell. Increments never contend, reads sum all cells."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._cells = []
+        self._cells_lock = threading.Lock()  # only taken the FIRST time a thread increments
+
+    def increment(self, amount=1):
+        try:
+            cell = self._local.cell
+        except AttributeError:
+            cell = self._local.cell = [0]
+            with self._cells_lock:
+                self._cells.append(cell)
+        cell[0] += amount  # only this thread ever writes this cell
+
+    @property
+    def value(self):
+        return sum(cell[0] for cell in list(self._cells))
+
+
+class CounterView:
+    """Lets a ShardedCounter be read like a normal static attribute: BankAccount.total_accounts"""
+
+    def __init__(self, counter):
+        self.counter = counter
+
+    def __get__(self, instance, owner):
+        return self.counter.value
+
+
+class BankAccount:
+    # ========== STATIC ATTRIBUTES (CLASS ATTRIBUTES) ==========
+    bank_name = "Global Bank"
+    interest_rate = 0.03
+    _account_counter = ShardedCounter()           # ← STATIC: one cell per thread
+    total_accounts = CounterView(_account_counter)  # ← STATIC: summed when you read it
+    _locks = StripedLock(64)                      # ← STATIC: shared pool of locks
+    _account_numbers = itertools.count()          # ← STATIC: next(...) is atomic in CPython
+
+    def __init__(self, account_holder, initial_balance=0):
+        self.account_holder = account_holder
+        self.account_number = next(BankAccount._account_numbers)
+        self._lock = BankAccount._locks.lock_for(self.account_number)  # our stripe
+        self.balance = initial_balance
+        BankAccount._account_counter.increment()
+
+    def deposit(self, amount):
+        """Add money to the account, returns True if the deposit was accepted"""
+        if amount <= 0:
+            return False
+        with self._lock:
+            self.balance += amount
+        return True
+
+    def withdraw(self, amount):
+        """Remove money from the account, returns True if the withdrawal was accepted"""
+        with self._lock:
+            if 0 < amount <= self.balance:
+                self.balance -= amount
+                return True
+        return False
+
+    def transfer_to(self, other, amount):
+        """Move money between two accounts atomically.
+        Both stripes are always taken in the same order (lowest first) so two opposite
+        transfers can never wait for each other forever (a deadlock)."""
+        first, second = sorted((self._lock, other._lock), key=id)
+        with first:
+            if second is first:
+                return self._move(other, amount)
+            with second:
+                return self._move(other, amount)
+
+    def _move(self, other, amount):
+        if 0 < amount <= self.balance:
+            self.balance -= amount
+            other.balance += amount
+            return True
+        return False
+
+    def calculate_interest(self):
+        return self.balance * BankAccount.interest_rate
+
+    @classmethod
+    def get_total_accounts(cls):
+        """Class method to access static attribute"""
+        return cls.total_accounts
+
+
+class GlobalLockBankAccount:
+    """The simple alternative for comparison: ONE lock for all accounts"""
+    _lock = threading.Lock()
+
+    def __init__(self, account_holder, initial_balance=0):
+        self.account_holder = account_holder
+        self.balance = initial_balance
+
+    def deposit(self, amount):
+        if amount <= 0:
+            return False
+        with GlobalLockBankAccount._lock:
+            self.balance += amount
+        return True
+
+
+def run_contention_benchmark(account_class, threads, total_operations=400_000):
+    """Every thread deposits into its own accounts. Returns operations per second."""
+    import time
+
+    per_thread = total_operations // threads
+    accounts = [[account_class(f"holder-{t}-{i}") for i in range(8)] for t in range(threads)]
+    barrier = threading.Barrier(threads + 1)
+
+    def worker(own_accounts):
+        barrier.wait()
+        for i in range(per_thread):
+            own_accounts[i & 7].deposit(1)
+
+    workers = [threading.Thread(target=worker, args=(accounts[t],)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for w in workers:
+        w.join()
+    elapsed = time.perf_counter() - start
+
+    deposited = sum(account.balance for group in accounts for account in group)
+    assert deposited == per_thread * threads, "lost updates!"
+    return per_thread * threads / elapsed
+
+
+# Example usage
+if __name__ == "__main__":
+    print("=== Thread-Safe Accounts Demo ===\n")
+
+    # Many threads open accounts and deposit into ONE shared account at the same time
+    shared = BankAccount("Shared Pot", 0)
+    before = BankAccount.total_accounts
+
+    def open_and_deposit():
+        for _ in range(1_000):
+            BankAccount("someone")
+            shared.deposit(1)
+
+    workers = [threading.Thread(target=open_and_deposit) for _ in range(16)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+
+    print(f"Accounts opened by 16 threads: {BankAccount.total_accounts - before} (expected 16000)")
+    print(f"Shared balance:                {shared.balance} (expected 16000)")
+    print(f"Total accounts (class method): {BankAccount.get_total_accounts()}")
+
+    # Transfers in both directions at the same time do not deadlock
+    alice, bob = BankAccount("Alice", 10_000), BankAccount("Bob", 10_000)
+    t1 = threading.Thread(target=lambda: [alice.transfer_to(bob, 1) for _ in range(5_000)])
+    t2 = threading.Thread(target=lambda: [bob.transfer_to(alice, 1) for _ in range(5_000)])
+    t1.start(); t2.start(); t1.join(); t2.join()
+    print(f"After opposite transfers: Alice {alice.balance} + Bob {bob.balance} = {alice.balance + bob.balance}\n")
+
+    print("=== Contention Benchmark (deposits/sec) ===")
+    print(f"{'threads':>8} {'striped locks':>15} {'one global lock':>17}")
+    for threads in (1, 4, 16, 64):
+        striped = run_contention_benchmark(BankAccount, threads)
+        global_lock = run_contention_benchmark(GlobalLockBankAccount, threads)
+        print(f"{threads:>8} {striped:>15,.0f} {global_lock:>17,.0f}")
+
+    print("\nNOTE: in CPython the GIL lets only one thread run Python code at a time,")
+    print("so extra threads cannot make pure-Python deposits faster. What striping buys you")
+    print("is that throughput does not COLLAPSE as threads are added, and no update is lost.")
@@ -0,0 +1,207 @@
+"""
+make_bird_move() in 4_Liskov Substitution Principle.py moves one bird OBJECT at a time.
+As the model for an agent simulation with a million birds, a million objects cost a lot of MEMORY:
+every bird is a full Python object with an attribute dict and six float objects (close to 300 bytes per bird).
+
+A Flock stores the birds COLUMN BY COLUMN, one group per concrete bird class (like the ShapeCollection
+in 6_shape_collection.py): x, y, z, vx, vy, vz are arrays of plain 8-byte floats, about 44 bytes per bird.
+A tick runs one movement KERNEL per group that updates whole columns:
+- FlyingBird moves in 3D, and its altitude stays between the ground and MAX_ALTITUDE
+- NonFlyingBird is bound to the ground: it has no z and no vz at all
+
+LSP still holds: every bird can be moved, and Sparrow/Ostrich simply inherit the kernel of their parent.
+move() on a single bird object still exists and gives exactly the same result as the kernel.
+This is a MEMORY optimization only. The goal of advancing the birds FASTER than move() per object is NOT met:
+in pure Python the kernels reach about the same ticks per second as move(), and were even slower in some runs
+(7.6 against 10.7 ticks/s). That speed-up needs real array arithmetic such as NumPy, which this repository does not use.
+"""
+
+from abc import ABC, abstractmethod
+from array import array
+from itertools import repeat
+from operator import add, mul
+
+MAX_ALTITUDE = 500.0
+
+
+class Bird(ABC):
+    columns = ()  # the per-bird numbers a Flock stores in columns
+
+    @abstractmethod
+    def move(self, dt):
+        pass
+
+    @staticmethod
+    @abstractmethod
+    def advance(columns, dt):
+        """Move every bird of one group by one tick, updating the column arrays"""
+        pass
+
+
+def _step(position, velocity, dt):
+    """position + velocity * dt for a whole column, with the loops running in C (map + operator)"""
+    return array("d", map(add, position, map(mul, velocity, repeat(dt, len(velocity)))))
+
+
+class FlyingBird(Bird):
+    columns = ("x", "y", "z", "vx", "vy", "vz")
+
+    def __init__(self, x=0.0, y=0.0, z=0.0, vx=0.0, vy=0.0, vz=0.0):
+        self.x, self.y, self.z = x, y, z
+        self.vx, self.vy, self.vz = vx, vy, vz
+
+    def move(self, dt):
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+        self.z = min(MAX_ALTITUDE, max(0.0, self.z + self.vz * dt))
+
+    @staticmethod
+    def advance(columns, dt):
+        columns["x"] = _step(columns["x"], columns["vx"], dt)
+        columns["y"] = _step(columns["y"], columns["vy"], dt)
+        z = _step(columns["z"], columns["vz"], dt)
+        if z and (min(z) < 0.0 or max(z) > MAX_ALTITUDE):  # two fast scans; clamping is only needed now and then
+            n = len(z)
+            z = array("d", map(min, repeat(MAX_ALTITUDE, n), map(max, repeat(0.0, n), z)))
+        columns["z"] = z
+
+
+class NonFlyingBird(Bird):
+    columns = ("x", "y", "vx", "vy")
+
+    def __init__(self, x=0.0, y=0.0, vx=0.0, vy=0.0):
+        self.x, self.y = x, y
+        self.vx, self.vy = vx, vy
+
+    @property
+    def z(self):
+        return 0.0  # always on the ground
+
+    def move(self, dt):
+        self.x += self.vx * dt
+        self.y += self.vy * dt
+
+    @staticmethod
+    def advance(columns, dt):
+        columns["x"] = _step(columns["x"], columns["vx"], dt)
+        columns["y"] = _step(columns["y"], columns["vy"], dt)
+
+
+class Sparrow(FlyingBird):
+    pass
+
+
+class Ostrich(NonFlyingBird):
+    pass
+
+
+class Flock:
+    def __init__(self):
+        self._groups = {}  # concrete bird class -> {column name: array('d')}
+        self.ticks = 0
+
+    def __len__(self):
+        return sum(len(columns["x"]) for columns in self._groups.values())
+
+    def add(self, bird: Bird):
+        """Copy one bird's numbers into the columns of its group; returns its index within the group"""
+        columns = self._group(type(bird))
+        for name in type(bird).columns:
+            columns[name].append(getattr(bird, name))
+        return len(columns["x"]) - 1
+
+    def add_many(self, bird_class, **values):
+        """Bulk load one bird class straight from columns, without creating bird objects"""
+        names = bird_class.columns
+        if set(values) != set(names):
+            raise ValueError(f"{bird_class.__name__} needs exactly the columns {names}")
+        if len({len(values[name]) for name in names}) != 1:
+            raise ValueError("all columns must have the same length")
+        columns = self._group(bird_class)
+        for name in names:
+            columns[name].extend(values[name])
+
+    def tick(self, dt=1.0):
+        """Advance every bird by one time step: one kernel call per bird class, not one call per bird"""
+        for bird_class, columns in self._groups.items():
+            bird_class.advance(columns, dt)
+        self.ticks += 1
+
+    def position(self, bird_class, index):
+        columns = self._groups[bird_class]
+        return columns["x"][index], columns["y"][index], columns["z"][index] if "z" in columns else 0.0
+
+    def count_by_type(self):
+        return {cls.__name__: len(columns["x"]) for cls, columns in self._groups.items()}
+
+    def _group(self, bird_class):
+        columns = self._groups.get(bird_class)
+        if columns is None:
+            columns = self._groups[bird_class] = {name: array("d") for name in bird_class.columns}
+        return columns
+
+
+if __name__ == "__main__":
+    import random
+    import sys
+    import time
+    import tracemalloc
+
+    sparrow = Sparrow(z=10.0, vx=2.0, vz=-4.0)
+    ostrich = Ostrich(vx=1.5, vy=0.5)
+    flock = Flock()
+    indexes = flock.add(sparrow), flock.add(ostrich)
+    for _ in range(3):
+        sparrow.move(1.0)
+        ostrich.move(1.0)
+        flock.tick(1.0)
+    print(f"Sparrow: object {(sparrow.x, sparrow.y, sparrow.z)}, flock {flock.position(Sparrow, indexes[0])}")
+    print(f"Ostrich: object {(ostrich.x, ostrich.y, ostrich.z)}, flock {flock.position(Ostrich, indexes[1])}")
+
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    rng = random.Random(2)
+    n_sparrows = n * 3 // 4
+    n_ostriches = n - n_sparrows
+
+    def uniform(count, low, high):
+        return array("d", (rng.uniform(low, high) for _ in range(count)))
+
+    flock = Flock()
+    flock.add_many(Sparrow, x=uniform(n_sparrows, 0, 1000), y=uniform(n_sparrows, 0, 1000),
+                   z=uniform(n_sparrows, 0, MAX_ALTITUDE), vx=uniform(n_sparrows, -5, 5),
+                   vy=uniform(n_sparrows, -5, 5), vz=uniform(n_sparrows, -1, 1))
+    flock.add_many(Ostrich, x=uniform(n_ostriches, 0, 1000), y=uniform(n_ostriches, 0, 1000),
+                   vx=uniform(n_ostriches, -3, 3), vy=uniform(n_ostriches, -3, 3))
+    print(f"\nSimulating {len(flock):,} birds {flock.count_by_type()}")
+
+    ticks = 5
+    started = time.perf_counter()
+    for _ in range(ticks):
+        flock.tick(0.1)
+    flock_time = (time.perf_counter() - started) / ticks
+
+    birds = [Sparrow(rng.uniform(0, 1000), rng.uniform(0, 1000), rng.uniform(0, MAX_ALTITUDE),
+                     rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-1, 1))
+             if i % 4 else Ostrich(rng.uniform(0, 1000), rng.uniform(0, 1000), rng.uniform(-3, 3), rng.uniform(-3, 3))
+             for i in range(n)]
+    started = time.perf_counter()
+    for _ in range(ticks):
+        for bird in birds:
+            bird.move(0.1)
+    objects_time = (time.perf_counter() - started) / ticks
+
+    tracemalloc.start()
+    sample = [Sparrow(*(rng.random() for _ in range(6))) if i % 4 else Ostrich(*(rng.random() for _ in range(4)))
+              for i in range(10_000)]
+    object_bytes = tracemalloc.get_traced_memory()[0] / len(sample)
+    tracemalloc.stop()
+    flock_bytes = sum(column.itemsize * len(column) for columns in flock._groups.values()
+                      for column in columns.values()) / len(flock)
+
+    print(f"  bird objects:  {object_bytes:5.0f} bytes per bird, bird.move() per object:  {1 / objects_time:6.2f} ticks/s")
+    print(f"  Flock columns: {flock_bytes:5.0f} bytes per bird, one kernel per bird class: {1 / flock_time:6.2f} ticks/s")
+
+# The gain is MEMORY: 8 bytes per number instead of a whole object per bird. The throughput goal is not met: the speed
+# is about the same or a bit slower, because in pure Python every number is still turned into a float object for the arithmetic and every
+# column is rebuilt. The column layout is what NumPy needs, though: there each kernel becomes a few array
+# expressions such as `x += vx * dt`, which run at C speed.
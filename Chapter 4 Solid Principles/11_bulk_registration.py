@@ -0,0 +1,226 @@
+"""
+In 2_Single Responsibility Principle (SRP).py a user is registered with User.register(),
+and then EmailService.send() is called for that one user. Importing hundreds of thousands of users that way means:
+- the whole import is usually read into a list first (memory grows with the size of the file)
+- nobody checks that a username or email is not already taken
+- one email call per user, which for a real provider is one network round trip per user
+
+A UserRegistry keeps the same split of responsibilities and adds a BULK path:
+- register_many() STREAMS the records: it reads one record, decides, and forgets it again.
+  Only the hash indexes (a set of taken usernames and a set of taken emails) stay in memory,
+  so memory grows with the number of ACCEPTED users, never with the size of the input file
+- a duplicate username or email is rejected with one set lookup
+- accepted users are collected in a batch of `batch_size` and handed to EmailService.send_batch() in one call
+- the ImportReport counts what happened and keeps a few examples of rejected rows (not all of them!)
+"""
+
+import csv
+
+
+class EmailService:
+    def send(self, subject, recipient):
+        print(f"Sending email to {recipient} with subject: {subject}")
+
+    def send_batch(self, subject, recipients):
+        """One call for many recipients. A real provider accepts a list of recipients per API request."""
+        print(f"Sending email to {len(recipients)} recipients with subject: {subject}")
+
+
+class User:
+    def __init__(self, username, email):
+        self.username = username
+        self.email = email
+
+    def register(self):
+        """Registers the user."""
+        print(f"Registering user: {self.username}")  # emulate some registration logic
+
+
+class ImportReport:
+    MAX_EXAMPLES = 10  # rejected rows kept as examples: enough to debug, small enough for any import
+
+    def __init__(self):
+        self.accepted = 0
+        self.duplicate_username = 0
+        self.duplicate_email = 0
+        self.invalid = 0
+        self.email_batches = 0
+        self.email_failed = 0  # registered users whose welcome email did not go out
+        self.examples = []  # (line number, reason, record)
+
+    def reject(self, line, reason, record):
+        if len(self.examples) < self.MAX_EXAMPLES:
+            self.examples.append((line, reason, record))
+
+    def __repr__(self):
+        return (f"ImportReport(accepted={self.accepted:,}, duplicate_username={self.duplicate_username:,}, "
+                f"duplicate_email={self.duplicate_email:,}, invalid={self.invalid:,}, "
+                f"email_batches={self.email_batches:,}, email_failed={self.email_failed:,})")
+
+
+class UserRegistry:
+    def __init__(self, email_service: EmailService, batch_size=1000):
+        self.email_service = email_service
+        self.batch_size = batch_size
+        self._usernames = set()  # hash index: usernames already taken
+        self._emails = set()     # hash index: emails already taken (lower case, so Jane@X.com == jane@x.com)
+
+    def __len__(self):
+        return len(self._usernames)
+
+    def register(self, user: User):
+        """The single-user path of 2_Single Responsibility Principle (SRP).py, with the duplicate checks added"""
+        username, email = normalize(user.username, user.email)
+        if username in self._usernames or email.lower() in self._emails:
+            raise ValueError(f"{username} / {email} is already registered")
+        user.username, user.email = username, email
+        user.register()
+        self._usernames.add(username)
+        self._emails.add(email.lower())
+        self.email_service.send("Welcome!", user.email)
+
+    def register_many(self, records, on_registered=None):
+        """Register (username, email) records from any iterable, e.g. read_user_records(path).
+        on_registered(batch) is called with every batch of accepted users, e.g. to store them.
+        The names of a batch are taken as soon as on_registered went through: if it raises, none of its users
+        count as registered and the same records can be imported again. A failing send_batch does not undo
+        the registration (the users are stored already), it is counted in report.email_failed instead."""
+        report = ImportReport()
+        usernames, emails = self._usernames, self._emails
+        batch = []
+        batch_usernames, batch_emails = set(), set()  # the accepted users of the batch that is not flushed yet
+        for line, record in enumerate(records, start=1):
+            try:
+                username, email = normalize(*record)
+            except (TypeError, ValueError, AttributeError):  # not a pair of strings
+                report.invalid += 1
+                report.reject(line, "expected 2 fields", record)
+                continue
+            if not username or "@" not in email:
+                report.invalid += 1
+                report.reject(line, "invalid", record)
+                continue
+            key = email.lower()
+            if username in usernames or username in batch_usernames:
+                report.duplicate_username += 1
+                report.reject(line, "duplicate username", record)
+                continue
+            if key in emails or key in batch_emails:
+                report.duplicate_email += 1
+                report.reject(line, "duplicate email", record)
+                continue
+            batch_usernames.add(username)
+            batch_emails.add(key)
+            batch.append(User(username, email))
+            if len(batch) >= self.batch_size:
+                self._flush(batch, batch_usernames, batch_emails, report, on_registered)
+                batch = []
+                batch_usernames.clear()
+                batch_emails.clear()
+        if batch:
+            self._flush(batch, batch_usernames, batch_emails, report, on_registered)
+        return report
+
+    def _flush(self, batch, batch_usernames, batch_emails, report, on_registered):
+        if on_registered is not None:
+            on_registered(batch)
+        self._usernames |= batch_usernames  # stored: from now on these names are taken, whatever the email does
+        self._emails |= batch_emails
+        report.accepted += len(batch)
+        try:
+            self.email_service.send_batch("Welcome!", [user.email for user in batch])
+        except Exception as error:
+            report.email_failed += len(batch)
+            report.reject(None, f"welcome email failed: {error!r}", [user.email for user in batch[:3]])
+        else:
+            report.email_batches += 1
+
+
+def normalize(username, email):
+    """The same clean-up for register() and register_many(): surrounding spaces do not make a new user"""
+    return username.strip(), email.strip()
+
+
+def read_user_records(path):
+    """Stream (username, email) rows from a CSV file with a header line, one row at a time"""
+    with open(path, newline="", encoding="utf-8") as file:
+        reader = csv.reader(file)
+        next(reader, None)  # the header
+        yield from reader
+
+
+if __name__ == "__main__":
+    import contextlib
+    import itertools
+    import os
+    import random
+    import sys
+    import tempfile
+    import time
+    import tracemalloc
+
+    class NullWriter:
+        def write(self, text):
+            return len(text)
+
+        def flush(self):
+            pass
+
+    registry = UserRegistry(EmailService(), batch_size=2)
+    registry.register(User("jane_doe", "jane_doe@gmail.com"))
+    print(registry.register_many([("john_doe", "john_doe@gmail.com"), ("jane_doe", "other@gmail.com"),
+                                  ("jd", "JANE_DOE@gmail.com"), ("no_email", ""), ("max", "max@gmail.com")]))
+
+    # A big import file, with 2% duplicate rows
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    path = os.path.join(tempfile.mkdtemp(), "users.csv")
+    rng = random.Random(4)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["username", "email"])
+        for i in range(n):
+            j = rng.randrange(i) if i and rng.random() < 0.02 else i
+            writer.writerow([f"user{j}", f"user{j}@example.com"])
+    print(f"\nImporting {n:,} rows ({os.path.getsize(path) / 1e6:.0f} MB)")
+
+    class RemoteEmailService(EmailService):
+        """Every call is a request to the email provider: 0.2ms of network per call, however many recipients"""
+
+        def send(self, subject, recipient):
+            time.sleep(0.0002)
+
+        def send_batch(self, subject, recipients):
+            time.sleep(0.0002)
+
+    # One user at a time, like 2_Single Responsibility Principle (SRP).py: time a sample and scale up
+    sample = 20_000
+    one_by_one = UserRegistry(RemoteEmailService())
+    with contextlib.redirect_stdout(NullWriter()):
+        started = time.perf_counter()
+        for username, email in itertools.islice(read_user_records(path), sample):
+            try:
+                one_by_one.register(User(username, email))
+            except ValueError:
+                pass
+        per_row = (time.perf_counter() - started) / sample
+
+    bulk = UserRegistry(RemoteEmailService(), batch_size=1000)
+    started = time.perf_counter()
+    report = bulk.register_many(read_user_records(path))
+    elapsed = time.perf_counter() - started
+
+    # Memory: the input is streamed, so only the indexes grow (measured on a part of the file, tracemalloc is slow)
+    tracemalloc.start()
+    part = UserRegistry(RemoteEmailService()).register_many(itertools.islice(read_user_records(path), 200_000))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"  one user at a time (extrapolated): {per_row * n:6.1f}s")
+    print(f"  register_many, streamed:           {elapsed:6.1f}s")
+    print(f"  {report}")
+    print(f"  peak memory {peak / part.accepted:.0f} bytes per accepted user (the hash indexes), "
+          f"whatever the size of the file: about {peak / part.accepted * report.accepted / 1e6:.0f} MB here")
+    print(f"  first rejected rows: {report.examples[:3]}")
+
+# The indexes are the only thing that grows. If even the set of usernames and emails does not fit into memory,
+# the same register_many() loop works with a disk-based index, e.g. a SQLite table with UNIQUE columns.
@@ -0,0 +1,216 @@
+"""
+In 3_Open closed principle.py every shape computes its own area: one calculate_area() call per object.
+That is the right design for ONE shape, but summing the areas of tens of millions of shapes means
+tens of millions of method calls and attribute lookups.
+
+A ShapeCollection stores the shapes COLUMN BY COLUMN, one group per concrete shape type:
+    circles    -> radius: [5, 2, 7, ...]
+    rectangles -> height: [4, 1, ...], width: [6, 3, ...]
+and computes the areas of a whole group in one pass (a "vectorized" kernel).
+
+The Open/Closed Principle still holds: a new Shape subclass plugs itself in by declaring its
+`columns` and a `calculate_areas` kernel. The collection itself never has to be modified,
+and a subclass without a kernel still works through its normal calculate_area() method.
+"""
+import math
+import operator
+from abc import ABC, abstractmethod
+from array import array
+
+
+class Shape(ABC):
+    registry = {}  # concrete shape class -> the names of its columns
+
+    def __init_subclass__(cls, **kwargs):
+        """Registration hook: runs automatically for every new subclass of Shape"""
+        super().__init_subclass__(**kwargs)
+        columns = cls.__dict__.get("columns")
+        if columns is not None:
+            Shape.registry[cls] = tuple(columns)
+
+    @abstractmethod
+    def calculate_area(self) -> float:
+        pass
+
+
+class Circle(Shape):
+    columns = ("radius",)
+
+    def __init__(self, radius: float):
+        self.radius = radius
+
+    def calculate_area(self) -> float:
+        return math.pi * (self.radius ** 2)
+
+    @staticmethod
+    def calculate_areas(radius):
+        """Areas of many circles at once"""
+        pi = math.pi  # a local name is faster than looking up math.pi a million times
+        return array("d", [pi * r * r for r in radius])
+
+
+class Rectangle(Shape):
+    columns = ("height", "width")
+
+    def __init__(self, height: float, width: float):
+        self.height = height
+        self.width = width
+
+    def calculate_area(self) -> float:
+        return self.height * self.width
+
+    @staticmethod
+    def calculate_areas(height, width):
+        """Areas of many rectangles at once (map + operator.mul runs the loop in C)"""
+        return array("d", map(operator.mul, height, width))
+
+
+class ShapeCollection:
+    def __init__(self):
+        self._columns = {}  # shape class -> {column name: array('d')}
+        self._others = []   # shapes whose class has no columns: handled one by one
+
+    def __len__(self):
+        return sum(len(next(iter(columns.values()))) for columns in self._columns.values()) + len(self._others)
+
+    def add(self, shape: Shape):
+        names = Shape.registry.get(type(shape))
+        if names is None:
+            self._others.append(shape)
+            return
+        columns = self._group(type(shape), names)
+        for name in names:
+            columns[name].append(getattr(shape, name))
+
+    def extend(self, shapes):
+        for shape in shapes:
+            self.add(shape)
+
+    def extend_columns(self, shape_class, **values):
+        """Bulk load one shape type straight from columns, without creating objects"""
+        names = Shape.registry[shape_class]
+        if set(values) != set(names):
+            raise ValueError(f"{shape_class.__name__} needs exactly the columns {names}")
+        lengths = {len(values[name]) for name in names}
+        if len(lengths) != 1:
+            raise ValueError("all columns must have the same length")
+        columns = self._group(shape_class, names)
+        for name in names:
+            columns[name].extend(values[name])
+
+    def areas(self):
+        """Areas grouped by shape type: {shape class: array of areas}"""
+        result = {}
+        for shape_class, columns in self._columns.items():
+            kernel = _kernel(shape_class)
+            if kernel is not None:
+                result[shape_class] = kernel(*(columns[name] for name in Shape.registry[shape_class]))
+            else:
+                result[shape_class] = array("d", [shape_class.calculate_area(_Row(columns, i))
+                                                  for i in range(len(next(iter(columns.values()))))])
+        for shape in self._others:
+            result.setdefault(type(shape), array("d")).append(shape.calculate_area())
+        return result
+
+    def total_area(self) -> float:
+        return math.fsum(math.fsum(areas) for areas in self.areas().values())
+
+    def _group(self, shape_class, names):
+        columns = self._columns.get(shape_class)
+        if columns is None:
+            columns = self._columns[shape_class] = {name: array("d") for name in names}
+        return columns
+
+
+def _kernel(shape_class):
+    """The calculate_areas of shape_class, or None. An INHERITED kernel only fits if the class stores the same
+    columns as the parent that defines it: Square(Rectangle) with columns ("side",) must not get Rectangle's."""
+    for owner in shape_class.__mro__:
+        if "calculate_areas" in vars(owner):
+            if Shape.registry.get(owner) == Shape.registry[shape_class]:
+                return shape_class.calculate_areas
+            return None
+    return None
+
+
+class _Row:
+    """Looks like one shape to calculate_area(), but reads its attributes from the columns"""
+
+    def __init__(self, columns, index):
+        self._columns = columns
+        self._index = index
+
+    def __getattr__(self, name):
+        return self._columns[name][self._index]
+
+
+# A NEW shape: nothing in ShapeCollection has to change (Open/Closed Principle)
+class Triangle(Shape):
+    columns = ("base", "height")
+
+    def __init__(self, base: float, height: float):
+        self.base = base
+        self.height = height
+
+    def calculate_area(self) -> float:
+        return 0.5 * self.base * self.height
+
+    @staticmethod
+    def calculate_areas(base, height):
+        return array("d", [0.5 * b * h for b, h in zip(base, height)])
+
+
+# A new shape with columns but WITHOUT a kernel: calculate_area() is used row by row
+class Square(Shape):
+    columns = ("side",)
+
+    def __init__(self, side: float):
+        self.side = side
+
+    def calculate_area(self) -> float:
+        return self.side ** 2
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    rng = random.Random(1)
+    shapes = []
+    for _ in range(1_000_000):
+        kind = rng.random()
+        if kind < 0.45:
+            shapes.append(Circle(radius=rng.uniform(0.1, 10)))
+        elif kind < 0.9:
+            shapes.append(Rectangle(height=rng.uniform(0.1, 10), width=rng.uniform(0.1, 10)))
+        elif kind < 0.99:
+            shapes.append(Triangle(base=rng.uniform(0.1, 10), height=rng.uniform(0.1, 10)))
+        else:
+            shapes.append(Square(side=rng.uniform(0.1, 10)))
+
+    collection = ShapeCollection()
+    collection.extend(shapes)
+
+    start = time.perf_counter()
+    one_by_one = math.fsum(shape.calculate_area() for shape in shapes)
+    per_object_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    vectorized = collection.total_area()
+    collection_time = time.perf_counter() - start
+
+    print(f"Shapes: {len(collection):,}")
+    for shape_class, areas in collection.areas().items():
+        print(f"  {shape_class.__name__:<10} {len(areas):>8,} shapes, area {math.fsum(areas):>16,.2f}")
+    print(f"calculate_area() per object: {one_by_one:,.2f} in {per_object_time:.3f}s")
+    print(f"ShapeCollection per type:    {vectorized:,.2f} in {collection_time:.3f}s")
+    print(f"Same result: {math.isclose(one_by_one, vectorized, rel_tol=1e-9)}")
+
+    # Loading straight from columns skips creating the objects altogether
+    bulk = ShapeCollection()
+    bulk.extend_columns(Rectangle, height=array("d", [4.0, 1.0]), width=array("d", [6.0, 3.0]))
+    bulk.add(Circle(radius=5))
+    print(f"Bulk-loaded areas: { {cls.__name__: list(areas) for cls, areas in bulk.areas().items()} }")
+
+# The per-type grouping is also why the `if shape_type == ...` chain of the bad example is not needed:
+# the dispatch to the right formula happens once per TYPE, not once per SHAPE.
@@ -0,0 +1,264 @@
+"""
+Circle.calculate_area() and Rectangle.calculate_area() in 3_Open closed principle.py compute the area again
+on every call, and questions like "what is the total area?" or "which are the 10 largest shapes?" re-scan every shape.
+
+This example remembers results instead of recomputing them:
+- MEMOIZED AREA: calculate_area() caches its result. The dimensions (radius, height, width) are descriptors,
+  so reassigning one of them throws the cached area away
+- an AGGREGATE CONTAINER (ShapeStats) is told about every add, remove and resize, and keeps
+  the total area, the count per type and the top-K largest shapes up to date in O(log n) per change.
+  Reading an aggregate is then O(1) (the top-K is O(K log K), independent of the number of shapes)
+
+The Open/Closed Principle still holds: a new shape only declares its Dimension attributes and _compute_area().
+"""
+import heapq
+import itertools
+import math
+from abc import ABC, abstractmethod
+from collections import Counter
+
+
+class Dimension:
+    """A shape attribute whose change invalidates the cached area and notifies the containers"""
+
+    def __set_name__(self, owner, name):
+        self.storage_name = "_" + name
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        return getattr(instance, self.storage_name)
+
+    def __set__(self, instance, value):
+        old_value = getattr(instance, self.storage_name, None)
+        setattr(instance, self.storage_name, value)
+        if old_value is not None and old_value != value:
+            instance._dimension_changed()
+
+
+class Shape(ABC):
+    def __init__(self):
+        self._area = None
+        self._observers = []  # the containers this shape is in
+
+    def calculate_area(self) -> float:
+        if self._area is None:
+            self._area = self._compute_area()
+        return self._area
+
+    @abstractmethod
+    def _compute_area(self) -> float:
+        pass
+
+    def _dimension_changed(self):
+        old_area, self._area = self._area, None
+        if self._observers:
+            new_area = self.calculate_area()
+            for observer in self._observers:
+                observer._shape_resized(self, old_area, new_area)
+
+
+class Circle(Shape):
+    radius = Dimension()
+
+    def __init__(self, radius: float):
+        super().__init__()
+        self.radius = radius
+
+    def _compute_area(self) -> float:
+        return math.pi * (self.radius ** 2)
+
+
+class Rectangle(Shape):
+    height = Dimension()
+    width = Dimension()
+
+    def __init__(self, height: float, width: float):
+        super().__init__()
+        self.height = height
+        self.width = width
+
+    def _compute_area(self) -> float:
+        return self.height * self.width
+
+
+class TopK:
+    """The k largest values of a changing set of keys.
+    The k largest live in a min-heap (`_top`), all others in a max-heap (`_rest`).
+    Removed or changed entries are not searched for: they are just recognised as stale later ("lazy deletion")."""
+
+    def __init__(self, k):
+        if k < 1:  # with k == 0 there is no smallest of the top k to compare against
+            raise ValueError(f"k must be at least 1, got {k}")
+        self.k = k
+        self._top = []        # (value, seq, key)  -> smallest of the top k at _top[0]
+        self._rest = []       # (-value, seq, key) -> largest of the rest at _rest[0]
+        self._where = {}      # key -> (heap name, seq) of its ONE valid entry
+        self._top_size = 0
+        self._seq = itertools.count()
+
+    def __len__(self):
+        return len(self._where)
+
+    def add(self, key, value):
+        if key in self._where:
+            raise KeyError(f"{key!r} is already tracked")
+        seq = next(self._seq)
+        if self._top_size < self.k:
+            self._push_top(key, value, seq)
+            return
+        self._drop_stale(self._top, "top")
+        smallest_value, _, smallest_key = self._top[0]
+        if value > smallest_value:
+            heapq.heappop(self._top)
+            self._push_rest(smallest_key, smallest_value, next(self._seq))
+            self._top_size -= 1
+            self._push_top(key, value, seq)
+        else:
+            self._push_rest(key, value, seq)
+
+    def remove(self, key):
+        heap_name, _ = self._where.pop(key)
+        if heap_name == "top":
+            self._top_size -= 1
+            self._drop_stale(self._rest, "rest")
+            if self._rest:
+                negative_value, _, promoted = heapq.heappop(self._rest)
+                del self._where[promoted]
+                self._push_top(promoted, -negative_value, next(self._seq))
+        self._compact()
+
+    def update(self, key, value):
+        self.remove(key)
+        self.add(key, value)
+
+    def largest(self):
+        """[(value, key), ...] sorted from largest to smallest"""
+        live = [(value, key) for value, seq, key in self._top if self._where.get(key) == ("top", seq)]
+        return sorted(live, key=lambda item: item[0], reverse=True)
+
+    def _push_top(self, key, value, seq):
+        heapq.heappush(self._top, (value, seq, key))
+        self._where[key] = ("top", seq)
+        self._top_size += 1
+
+    def _push_rest(self, key, value, seq):
+        heapq.heappush(self._rest, (-value, seq, key))
+        self._where[key] = ("rest", seq)
+
+    def _drop_stale(self, heap, heap_name):
+        while heap and self._where.get(heap[0][2]) != (heap_name, heap[0][1]):
+            heapq.heappop(heap)
+
+    def _compact(self):
+        """Rebuild a heap when more than half of it is stale, so memory stays proportional to the live keys"""
+        if len(self._rest) > 2 * (len(self._where) - self._top_size) + 64:
+            self._rest = [entry for entry in self._rest if self._where.get(entry[2]) == ("rest", entry[1])]
+            heapq.heapify(self._rest)
+        if len(self._top) > 2 * self.k + 64:
+            self._top = [entry for entry in self._top if self._where.get(entry[2]) == ("top", entry[1])]
+            heapq.heapify(self._top)
+
+
+class ShapeStats:
+    """A container of shapes whose aggregates are always up to date"""
+
+    def __init__(self, top_k=10):
+        self._shapes = {}  # id(shape) -> shape
+        self._total_area = 0.0
+        self._count_by_type = Counter()
+        self._top = TopK(top_k)
+
+    def __len__(self):
+        return len(self._shapes)
+
+    def add(self, shape: Shape):
+        key = id(shape)
+        if key in self._shapes:
+            return
+        self._shapes[key] = shape
+        shape._observers.append(self)
+        area = shape.calculate_area()
+        self._total_area += area
+        self._count_by_type[type(shape).__name__] += 1
+        self._top.add(key, area)
+
+    def remove(self, shape: Shape):
+        key = id(shape)
+        del self._shapes[key]
+        shape._observers.remove(self)
+        self._total_area -= shape.calculate_area()
+        self._count_by_type[type(shape).__name__] -= 1
+        self._top.remove(key)
+
+    @property
+    def total_area(self) -> float:
+        return self._total_area
+
+    def count_by_type(self):
+        return +self._count_by_type  # a copy without the zero counts
+
+    def largest(self):
+        """The top-K shapes, largest first: [(area, shape), ...]"""
+        return [(area, self._shapes[key]) for area, key in self._top.largest()]
+
+    def recalculate_total(self):
+        """Adding and subtracting floats millions of times lets rounding errors pile up: start fresh"""
+        self._total_area = math.fsum(shape.calculate_area() for shape in self._shapes.values())
+        return self._total_area
+
+    def _shape_resized(self, shape, old_area, new_area):
+        self._total_area += new_area - old_area
+        self._top.update(id(shape), new_area)
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    circle = Circle(radius=5)
+    print(f"Circle area: {circle.calculate_area()}")
+    circle.radius = 1  # the cached area is thrown away
+    print(f"After resize: {circle.calculate_area()}")
+
+    stats = ShapeStats(top_k=3)
+    shapes = [Circle(radius=5), Rectangle(height=4, width=6), Circle(radius=1), Rectangle(height=10, width=10)]
+    for shape in shapes:
+        stats.add(shape)
+    print(f"Total area: {stats.total_area:.2f}, per type: {dict(stats.count_by_type())}")
+    print("Largest 3:", [(round(area, 2), type(shape).__name__) for area, shape in stats.largest()])
+    shapes[2].radius = 20  # the small circle grows and becomes the largest shape
+    stats.remove(shapes[3])
+    print("After resize and remove:", [(round(area, 2), type(shape).__name__) for area, shape in stats.largest()])
+
+    # Dashboard workload: many shapes, many resizes, aggregates read after every change
+    rng = random.Random(7)
+    n = 200_000
+    shapes = [Circle(rng.uniform(1, 10)) if rng.random() < 0.5 else Rectangle(rng.uniform(1, 10), rng.uniform(1, 10))
+              for _ in range(n)]
+    stats = ShapeStats(top_k=10)
+    for shape in shapes:
+        stats.add(shape)
+
+    queries = 200
+    start = time.perf_counter()
+    for _ in range(queries):
+        shape = rng.choice(shapes)
+        if isinstance(shape, Circle):
+            shape.radius = rng.uniform(1, 10)
+        else:
+            shape.width = rng.uniform(1, 10)
+        total, top = stats.total_area, stats.largest()
+    incremental = time.perf_counter() - start
+
+    rescans = 5  # a full re-scan is so slow that a few are enough to measure it
+    start = time.perf_counter()
+    for _ in range(rescans):
+        total = math.fsum(shape._compute_area() for shape in shapes)
+        top = heapq.nlargest(10, shapes, key=lambda s: s._compute_area())
+    rescan = time.perf_counter() - start
+
+    print(f"\n'resize one shape, then read total and top 10' over {n:,} shapes")
+    print(f"  re-scan every shape:        {rescan / rescans * 1e6:>12,.1f}us per query")
+    print(f"  incrementally maintained:   {incremental / queries * 1e6:>12,.1f}us per query")
+    print(f"  totals agree: {math.isclose(stats.total_area, stats.recalculate_total(), rel_tol=1e-9)}")
@@ -0,0 +1,324 @@
+"""
+In 5_Interface Segreagation Principle.py manage_workable() drives ONE Workable, synchronously.
+A job runner with thousands of HumanWorker/RobotWorker objects needs a SCHEDULER instead:
+- every task names the CAPABILITY (interface) it needs, e.g. Workable or Eatable, and the method to call
+- a task is only routed to workers that implement that interface: a robot never gets an Eatable task.
+  This is the ISP at runtime: the scheduler depends on the small interfaces, not on "Worker"
+- every worker runs in its own thread or process and handles its tasks one after the other
+- each worker accepts at most `max_queue` waiting tasks. When every suitable worker is full,
+  submit() WAITS (backpressure) instead of letting the queues grow without limit
+- per worker, the scheduler reports throughput and the queue wait (time from submit until the worker starts the task)
+
+A new interface (Chargeable below) needs no change to the scheduler at all.
+"""
+
+import itertools
+import multiprocessing
+import pickle
+import queue
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import Future
+
+
+class Workable(ABC):
+    @abstractmethod
+    def work(self, units=1):
+        pass
+
+
+class Eatable(ABC):
+    @abstractmethod
+    def eat(self):
+        pass
+
+
+class Chargeable(ABC):
+    """A FUTURE interface: the scheduler handles it without any change"""
+
+    @abstractmethod
+    def charge(self):
+        pass
+
+
+def busy_work(units):
+    """Some CPU work, standing in for a real job"""
+    total = 0
+    for i in range(units * 1000):
+        total += i * i
+    return total
+
+
+class HumanWorker(Workable, Eatable):
+    def __init__(self, name):
+        self.name = name
+
+    def work(self, units=1):
+        return busy_work(units)
+
+    def eat(self):
+        time.sleep(0.001)  # a (very) short lunch break
+        return f"{self.name} has eaten"
+
+
+class RobotWorker(Workable, Chargeable):
+    def __init__(self, name):
+        self.name = name
+
+    def work(self, units=1):
+        return busy_work(units)
+
+    def charge(self):
+        return f"{self.name} is charged"
+
+
+class WorkerDied(RuntimeError):
+    """Set on the futures of the tasks a worker had not finished when its thread or process ended"""
+
+
+class WorkerStats:
+    MAX_WAITS = 10_000  # the queue waits of the most recent tasks: enough for percentiles, bounded for a long run
+
+    def __init__(self, name):
+        self.name = name
+        self.completed = 0
+        self.failed = 0
+        self.busy = 0.0  # seconds spent running tasks
+        self.queue_waits = deque(maxlen=self.MAX_WAITS)  # seconds each task waited in the queue
+
+    def percentile_wait(self, fraction):
+        if not self.queue_waits:
+            return 0.0
+        ordered = sorted(self.queue_waits)
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    def __repr__(self):
+        return (f"WorkerStats({self.name}: {self.completed} done, {self.failed} failed, "
+                f"queue wait p50 {self.percentile_wait(0.5) * 1000:.1f}ms p99 {self.percentile_wait(0.99) * 1000:.1f}ms)")
+
+
+class CapabilityScheduler:
+    def __init__(self, workers, backend="thread", max_queue=16):
+        if backend not in ("thread", "process"):
+            raise ValueError("backend must be 'thread' or 'process'")
+        self.backend = backend
+        self.max_queue = max_queue
+        self._workers = list(workers)
+        self._eligible = {}  # capability -> indexes of the workers implementing it (filled on first use)
+        self._outstanding = [0] * len(self._workers)  # tasks submitted to a worker and not finished yet
+        self._stats = [WorkerStats(getattr(worker, "name", f"worker-{i}")) for i, worker in enumerate(self._workers)]
+        self._futures = {}  # task id -> (Future, worker index)
+        self._dead = set()  # indexes of the workers whose thread or process ended unexpectedly
+        self._task_ids = itertools.count()
+        self._lock = threading.Condition()
+        self._started = None
+        self._stopped = None
+        self._stopping = False
+
+        if backend == "thread":
+            self._results = queue.Queue()
+            self._inboxes = [queue.Queue() for _ in self._workers]
+            runner = threading.Thread
+        else:
+            self._results = multiprocessing.Queue()
+            self._inboxes = [multiprocessing.Queue() for _ in self._workers]
+            runner = multiprocessing.Process
+        self._runners = [runner(target=_worker_loop, args=(i, worker, self._inboxes[i], self._results,
+                                                           backend == "process"), daemon=True)
+                         for i, worker in enumerate(self._workers)]
+        self._collector = threading.Thread(target=self._collect, daemon=True)
+
+    def start(self):
+        self._started = time.perf_counter()
+        for runner in self._runners:
+            runner.start()
+        self._collector.start()
+        return self
+
+    def submit(self, capability, method_name, *args, timeout=None):
+        """Run `method_name(*args)` on some worker implementing `capability`; returns a Future.
+        Waits while every such worker already has max_queue tasks (raises queue.Full after `timeout` seconds)."""
+        if method_name not in capability.__abstractmethods__:
+            raise ValueError(f"{method_name}() is not part of the {capability.__name__} interface")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                if self._stopping:  # the workers are gone or leaving: the task would never run
+                    raise RuntimeError("scheduler is shut down")
+                candidates = [i for i in self._candidates(capability) if i not in self._dead]
+                if not candidates:
+                    raise LookupError(f"every {capability.__name__} worker has died")
+                chosen = min(candidates, key=self._outstanding.__getitem__)  # the shortest queue
+                if self._outstanding[chosen] < self.max_queue:
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise queue.Full(f"all {capability.__name__} workers are busy")
+                self._lock.wait(remaining)
+            self._outstanding[chosen] += 1
+            task_id = next(self._task_ids)
+            future = Future()
+            self._futures[task_id] = future, chosen
+        self._inboxes[chosen].put((task_id, method_name, args, time.time()))
+        return future
+
+    def shutdown(self):
+        """Finish every queued task, then stop the workers"""
+        with self._lock:
+            self._stopping = True
+            self._lock.notify_all()  # a submit() waiting for a free place must not wait for workers that are leaving
+        for inbox in self._inboxes:
+            inbox.put(None)
+        for runner in self._runners:
+            runner.join()
+        self._results.put(None)
+        self._collector.join()
+        self._stopped = time.perf_counter()
+        with self._lock:  # a worker that died during the shutdown left these behind
+            leftovers = list(self._futures.values())
+            self._futures.clear()
+        for future, worker_index in leftovers:
+            future.set_exception(WorkerDied(f"{self._stats[worker_index].name} stopped before finishing the task"))
+
+    def stats(self):
+        return list(self._stats)
+
+    def throughput(self):
+        """Tasks per second for every worker between start() and shutdown() (or now, while running)"""
+        elapsed = (self._stopped or time.perf_counter()) - self._started
+        return {stats.name: stats.completed / elapsed for stats in self._stats}
+
+    def _candidates(self, capability):
+        candidates = self._eligible.get(capability)
+        if candidates is None:
+            candidates = [i for i, worker in enumerate(self._workers) if isinstance(worker, capability)]
+            if not candidates:
+                raise LookupError(f"no worker implements {capability.__name__}")
+            self._eligible[capability] = candidates
+        return candidates
+
+    def _collect(self):
+        """Turns the workers' reports into results, statistics and free queue places.
+        While no report arrives it checks that the workers are still alive."""
+        while True:
+            try:
+                report = self._results.get(timeout=0.5)
+            except queue.Empty:
+                if not self._stopping:
+                    self._check_runners()
+                continue
+            if report is None:
+                return
+            if isinstance(report, bytes):  # the process backend pickles its reports itself
+                report = pickle.loads(report)
+            worker_index, task_id, waited, duration, result, error = report
+            stats = self._stats[worker_index]
+            stats.queue_waits.append(waited)
+            stats.busy += duration
+            with self._lock:
+                entry = self._futures.pop(task_id, None)
+                if entry is None:
+                    continue  # its worker was already declared dead and the future failed
+                self._outstanding[worker_index] -= 1
+                self._lock.notify_all()
+            future = entry[0]
+            if error is None:
+                stats.completed += 1
+                future.set_result(result)
+            else:
+                stats.failed += 1
+                future.set_exception(error)
+
+
+    def _check_runners(self):
+        """Fail the waiting tasks of a worker whose thread or process has ended (killed, crashed, ...)
+        and stop routing tasks to it"""
+        for worker_index, runner in enumerate(self._runners):
+            if worker_index in self._dead or runner.is_alive():
+                continue
+            name = self._stats[worker_index].name
+            reason = f" (exit code {runner.exitcode})" if hasattr(runner, "exitcode") else ""
+            with self._lock:
+                self._dead.add(worker_index)
+                lost = [task_id for task_id, (_, index) in self._futures.items() if index == worker_index]
+                futures = [self._futures.pop(task_id)[0] for task_id in lost]
+                self._outstanding[worker_index] = 0
+                self._lock.notify_all()  # submit() may now pick another worker, or raise LookupError
+            for future in futures:
+                self._stats[worker_index].failed += 1
+                future.set_exception(WorkerDied(f"{name} died{reason}"))
+
+
+def _worker_loop(worker_index, worker, inbox, results, pickled):
+    """Runs in the worker's own thread or process: one task at a time, in arrival order.
+    With `pickled`, every report is pickled HERE: a multiprocessing.Queue pickles in a background thread and
+    silently drops what it cannot pickle, which would leave the task's future pending forever."""
+    while True:
+        task = inbox.get()
+        if task is None:
+            return
+        task_id, method_name, args, submitted_at = task
+        started = time.time()
+        try:
+            result, error = getattr(worker, method_name)(*args), None
+        except BaseException as exc:  # SystemExit, KeyboardInterrupt, ...: still the task's outcome, not ours
+            result, error = None, exc
+        report = (worker_index, task_id, started - submitted_at, time.time() - started, result, error)
+        if pickled:
+            try:
+                report = pickle.dumps(report)
+            except Exception as exc:
+                what = "result" if error is None else f"exception {error!r}"
+                report = pickle.dumps(report[:4] + (None, TypeError(f"the {what} of {method_name}() "
+                                                                     f"cannot be pickled: {exc}")))
+        results.put(report)
+
+
+if __name__ == "__main__":
+    import os
+
+    workers = [HumanWorker(f"human-{i}") if i % 2 else RobotWorker(f"robot-{i}") for i in range(4)]
+    scheduler = CapabilityScheduler(workers).start()
+    print(scheduler.submit(Eatable, "eat").result())
+    print(scheduler.submit(Chargeable, "charge").result())
+    print(f"work: {scheduler.submit(Workable, 'work', 1).result()}")
+    try:
+        scheduler.submit(Eatable, "work")
+    except ValueError as exc:
+        print(f"Rejected: {exc}")
+    scheduler.shutdown()
+
+    def run(backend, n_workers, n_tasks, units):
+        workers = [HumanWorker(f"human-{i}") if i % 2 else RobotWorker(f"robot-{i}") for i in range(n_workers)]
+        scheduler = CapabilityScheduler(workers, backend=backend, max_queue=8).start()
+        started = time.perf_counter()
+        futures = [scheduler.submit(Workable, "work", units) if i % 10 else scheduler.submit(Eatable, "eat")
+                   for i in range(n_tasks)]
+        for future in futures:
+            future.result()
+        elapsed = time.perf_counter() - started
+        scheduler.shutdown()
+        all_stats = scheduler.stats()
+        waits = sorted(wait for stats in all_stats for wait in stats.queue_waits)
+        print(f"  {backend:<7} {n_workers:>3} workers: {n_tasks / elapsed:8,.0f} tasks/s, "
+              f"queue wait p99 {waits[int(0.99 * len(waits))] * 1000:6.1f}ms")
+        return scheduler
+
+    n_workers = max(4, os.cpu_count() or 1)
+    print(f"\n2,000 tasks (90% Workable CPU work, 10% Eatable), {os.cpu_count()} cores")
+    plain = time.perf_counter()
+    for i in range(200):
+        workers[i % 4].work(20)
+    print(f"  plain loop, one worker after the other: {200 / (time.perf_counter() - plain):8,.0f} tasks/s")
+    run("thread", n_workers, 2_000, 20)
+    scheduler = run("process", n_workers, 2_000, 20)
+    print("  per worker (process backend):")
+    throughput = scheduler.throughput()
+    for stats in scheduler.stats():
+        print(f"    {throughput[stats.name]:6,.0f} tasks/s  {stats}")
+
+# Threads share one interpreter, so for CPU work they are no faster than a plain loop (the GIL);
+# the process backend uses every core, at the price of pickling the worker, the arguments and the results.
+# Note that only the humans ever get the eat() tasks: routing by interface is what makes that safe.
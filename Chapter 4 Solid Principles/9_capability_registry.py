@@ -0,0 +1,196 @@
+"""
+The good designs in 4_Liskov Substitution Principle.py (Bird, FlyingBird, NonFlyingBird),
+5_Interface Segreagation Principle.py (Workable, Eatable) and 6_coupling.py (NotificationService)
+all build on ABC, and code that uses them asks questions like `isinstance(worker, Eatable)`.
+
+isinstance() against an ABC is much slower than against a normal class: it goes through
+ABCMeta.__instancecheck__, its caches, register()ed "virtual" subclasses and __subclasshook__.
+Filtering a list of a million objects by interface then spends most of its time in those checks.
+
+A CapabilityRegistry answers the same question from a table that is computed ONCE per concrete class:
+    {HumanWorker: frozenset({Workable, Eatable}), RobotWorker: frozenset({Workable}), ...}
+so `supports(obj, Eatable)` is one dict lookup plus one set membership test.
+
+The table must be thrown away when the answer can change. A NEW subclass is simply not in the table yet
+(it is computed on first use), but `Eatable.register(SomeClass)` changes the answer for a class we already know.
+Python counts such registrations in abc.get_cache_token(), and the registry starts over whenever that token changes.
+"""
+
+import abc
+from abc import ABC, abstractmethod
+
+
+# The interfaces of 4_Liskov Substitution Principle.py
+class Bird(ABC):
+    @abstractmethod
+    def move(self):
+        pass
+
+
+class FlyingBird(Bird):
+    def move(self):
+        print("Flying")
+
+
+class NonFlyingBird(Bird):
+    def move(self):
+        print("Walking")
+
+
+class Sparrow(FlyingBird):
+    pass
+
+
+class Ostrich(NonFlyingBird):
+    pass
+
+
+# The interfaces of 5_Interface Segreagation Principle.py
+class Workable(ABC):
+    @abstractmethod
+    def work(self):
+        pass
+
+
+class Eatable(ABC):
+    @abstractmethod
+    def eat(self):
+        pass
+
+
+class HumanWorker(Workable, Eatable):
+    def work(self):
+        print("Human working")
+
+    def eat(self):
+        print("Human eating")
+
+
+class RobotWorker(Workable):
+    def work(self):
+        print("Robot working")
+
+
+# The interface of 6_coupling.py
+class NotificationService(ABC):
+    @abstractmethod
+    def send_notification(self, message: str):
+        pass
+
+
+class EmailService(NotificationService):
+    def send_notification(self, message: str):
+        print(f"Sending email with message: {message}")
+
+
+class SMSService(NotificationService):
+    def send_notification(self, message: str):
+        print(f"Sending SMS with message: {message}")
+
+
+class CapabilityRegistry:
+    def __init__(self, interfaces=()):
+        self._interfaces = list(interfaces)
+        self._by_class = {}  # concrete class -> frozenset of the interfaces it satisfies
+        self._token = abc.get_cache_token()
+
+    def supports(self, obj, interface) -> bool:
+        """Same answer as isinstance(obj, interface), from the precomputed table"""
+        if abc.get_cache_token() != self._token:
+            self.invalidate()
+        interfaces = self._by_class.get(type(obj))
+        if interfaces is None:
+            interfaces = self._resolve(type(obj))
+        if interface in interfaces:
+            return True
+        if interface not in self._interfaces:  # an interface we have not seen before: add it and ask again
+            self.add_interface(interface)
+            return self.supports(obj, interface)
+        return False
+
+    def interfaces_of(self, cls):
+        if abc.get_cache_token() != self._token:
+            self.invalidate()
+        interfaces = self._by_class.get(cls)
+        return interfaces if interfaces is not None else self._resolve(cls)
+
+    def filter(self, objects, interface):
+        """All objects that support `interface`. The table is looked up once per object, the rest is a set test."""
+        if interface not in self._interfaces:
+            self.add_interface(interface)
+        if abc.get_cache_token() != self._token:
+            self.invalidate()
+        by_class = self._by_class
+        resolve = self._resolve
+        result = []
+        for obj in objects:
+            cls = type(obj)
+            interfaces = by_class.get(cls)
+            if interfaces is None:
+                interfaces = resolve(cls)
+            if interface in interfaces:
+                result.append(obj)
+        return result
+
+    def add_interface(self, interface):
+        self._interfaces.append(interface)
+        self.invalidate()
+
+    def invalidate(self):
+        """Forget every class: the next questions recompute them with issubclass()"""
+        self._by_class.clear()
+        self._token = abc.get_cache_token()
+
+    def _resolve(self, cls):
+        interfaces = frozenset(interface for interface in self._interfaces if issubclass(cls, interface))
+        self._by_class[cls] = interfaces
+        return interfaces
+
+
+if __name__ == "__main__":
+    import random
+    import time
+
+    registry = CapabilityRegistry([Bird, FlyingBird, NonFlyingBird, Workable, Eatable, NotificationService])
+    print(f"Sparrow flies: {registry.supports(Sparrow(), FlyingBird)}, Ostrich flies: {registry.supports(Ostrich(), FlyingBird)}")
+    print(f"RobotWorker eats: {registry.supports(RobotWorker(), Eatable)}")
+    print(f"EmailService: {sorted(i.__name__ for i in registry.interfaces_of(EmailService))}")
+
+    class Printer:
+        """Not a subclass of Workable, but registered as a 'virtual' one later"""
+
+        def work(self):
+            print("Printing")
+
+    printer = Printer()
+    print(f"Printer works before register(): {registry.supports(printer, Workable)}")
+    Workable.register(Printer)  # changes abc.get_cache_token(): the registry starts over
+    print(f"Printer works after register():  {registry.supports(printer, Workable)}")
+
+    # Filter a big mixed collection by interface
+    rng = random.Random(11)
+    kinds = [Sparrow, Ostrich, HumanWorker, RobotWorker, EmailService, SMSService, Printer]
+    objects = [rng.choice(kinds)() for _ in range(1_000_000)]
+
+    for interface in (Eatable, FlyingBird, Workable):
+        started = time.perf_counter()
+        with_isinstance = [obj for obj in objects if isinstance(obj, interface)]
+        isinstance_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with_supports = [obj for obj in objects if registry.supports(obj, interface)]
+        supports_time = time.perf_counter() - started
+
+        started = time.perf_counter()
+        with_filter = registry.filter(objects, interface)
+        filter_time = time.perf_counter() - started
+
+        assert with_isinstance == with_supports == with_filter
+        print(f"\nFilter {len(objects):,} objects by {interface.__name__} -> {len(with_filter):,}")
+        print(f"  isinstance():          {isinstance_time * 1000:7.1f}ms")
+        print(f"  registry.supports():   {supports_time * 1000:7.1f}ms")
+        print(f"  registry.filter():     {filter_time * 1000:7.1f}ms")
+
+# supports() is a METHOD call, which costs about as much as the table lookup saves; the big win comes from
+# filter(), which does the method call once for the whole collection. isinstance() is still the right default:
+# only reach for a registry when a profile shows ABC checks in a hot loop.
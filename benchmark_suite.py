@@ -0,0 +1,269 @@
+"""Micro-benchmarks for the hot classes of every chapter.
+
+The lessons are scripts (their file names contain spaces and start with a number), so they
+cannot be imported the normal way. load_lesson() runs a lesson file top-level statement by
+top-level statement with its output suppressed and remembers EVERY version of a class or
+function, because many lessons first show a bad design and then redefine the same name
+(for example the enum based Shape and the polymorphic Shape in 3_Open closed principle.py).
+Demo statements that fail on purpose (like make_bird_fly(ostrich)) are skipped.
+
+Usage:
+    python benchmark_suite.py run --output results.json
+    python benchmark_suite.py compare baseline.json results.json --threshold 10
+
+compare exits with status 1 when any benchmark got more than --threshold percent slower.
+"""
+
+import argparse
+import ast
+import contextlib
+import json
+import platform
+import statistics
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+CHAPTER_1 = ROOT / "Chapter 1 The basics of OOP"
+CHAPTER_2 = ROOT / "Chapter  2 OOP Principles"
+CHAPTER_4 = ROOT / "Chapter 4 Solid Principles"
+
+
+class NullWriter:
+    """A stdout replacement that throws everything away (cheaper than io.StringIO)"""
+
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+class Lesson:
+    """The namespace of a lesson file plus every version of every class/function it defined"""
+
+    def __init__(self, path):
+        self.path = path
+        self.namespace = {"__name__": f"lesson_{path.stem}", "__file__": str(path)}
+        self.versions = defaultdict(list)
+
+    def __getitem__(self, name):
+        """The LAST definition of a name, like a normal import would give you"""
+        return self.namespace[name]
+
+    def version(self, name, index):
+        """A specific definition of a name: 0 is the first one in the file, -1 the last"""
+        return self.versions[name][index]
+
+
+_lessons = {}
+
+
+def load_lesson(path):
+    """Execute a lesson file once (output suppressed) and cache the result"""
+    path = Path(path)
+    if path not in _lessons:
+        lesson = Lesson(path)
+        tree = ast.parse(path.read_text(encoding="utf-8"), filename=str(path))
+        with contextlib.redirect_stdout(NullWriter()):
+            for statement in tree.body:
+                code = compile(ast.Module(body=[statement], type_ignores=[]), str(path), "exec")
+                try:
+                    exec(code, lesson.namespace)
+                except Exception:
+                    continue  # demo code that fails on purpose to show a bad design
+                if isinstance(statement, (ast.ClassDef, ast.FunctionDef)):
+                    lesson.versions[statement.name].append(lesson.namespace[statement.name])
+        _lessons[path] = lesson
+    return _lessons[path]
+
+
+# ---------- the benchmarks ----------
+# Each benchmark function does its setup and returns the zero-argument callable to time.
+
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark("encapsulation.BankAccount.deposit")
+def bench_deposit():
+    account = load_lesson(CHAPTER_2 / "2_Encapsulation.py")["BankAccount"](1000)
+    return lambda: account.deposit(1)
+
+
+@benchmark("encapsulation.BankAccount.withdraw")
+def bench_withdraw():
+    account = load_lesson(CHAPTER_2 / "2_Encapsulation.py")["BankAccount"](10 ** 12)
+    return lambda: account.withdraw(1)
+
+
+@benchmark("ocp.Shape.calculate_area[enum]")
+def bench_enum_shape():
+    lesson = load_lesson(CHAPTER_4 / "3_Open closed principle.py")
+    Shape, ShapeType = lesson.version("Shape", 0), lesson["ShapeType"]
+    circle = Shape(ShapeType.CIRCLE, radius=5)
+    rectangle = Shape(ShapeType.RECTANGLE, height=4, width=6)
+    return lambda: (circle.calculate_area(), rectangle.calculate_area())
+
+
+@benchmark("ocp.Shape.calculate_area[polymorphic]")
+def bench_polymorphic_shape():
+    lesson = load_lesson(CHAPTER_4 / "3_Open closed principle.py")
+    circle = lesson["Circle"](radius=5)
+    rectangle = lesson["Rectangle"](height=4, width=6)
+    return lambda: (circle.calculate_area(), rectangle.calculate_area())
+
+
+@benchmark("polymorphism.Vehicle.start_stop")
+def bench_vehicle_dispatch():
+    lesson = load_lesson(CHAPTER_2 / "5_polymorphism.py")
+    vehicles = [lesson["Car"]("Toyota", "Camry", 2020, 4),
+                lesson["Motorcycle"]("Harley-Davidson", "Street 750", 2019, False)]
+
+    def run():
+        for vehicle in vehicles:
+            vehicle.start()
+            vehicle.stop()
+    return run
+
+
+@benchmark("composition.Car.drive")
+def bench_composed_car():
+    car = load_lesson(CHAPTER_2 / "7_composition.py")["Car"]()
+    return lambda: car.drive()
+
+
+@benchmark("coupling.Order.create[coupled]")
+def bench_coupled_order():
+    order = load_lesson(CHAPTER_2 / "6_coupling.py").version("Order", 0)()
+    return order.create
+
+
+@benchmark("coupling.Order.create[injected]")
+def bench_injected_order():
+    lesson = load_lesson(CHAPTER_2 / "6_coupling.py")
+    order = lesson.version("Order", -1)(lesson["EmailService"]())
+    return order.create
+
+
+@benchmark("isp.manage_workable")
+def bench_manage_workable():
+    lesson = load_lesson(CHAPTER_4 / "5_Interface Segreagation Principle.py")
+    manage_workable = lesson["manage_workable"]
+    human, robot = lesson["HumanWorker"](), lesson["RobotWorker"]()
+    return lambda: (manage_workable(human), manage_workable(robot))
+
+
+# ---------- timing ----------
+
+def time_callable(func, warmup, repeat, min_time):
+    """Returns the per-call time in nanoseconds of every repetition.
+    The number of calls per repetition is calibrated so one repetition takes at least min_time."""
+    number = 1
+    with contextlib.redirect_stdout(NullWriter()):
+        while True:
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            if time.perf_counter() - start >= min_time / 10:
+                break
+            number *= 2
+        number = max(1, int(number * min_time / max(time.perf_counter() - start, 1e-9)))
+
+        for _ in range(warmup):
+            for _ in range(number):
+                func()
+
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number * 1e9)
+    return number, timings
+
+
+def run(args):
+    selected = [name for name in BENCHMARKS if not args.filter or args.filter in name]
+    results = {}
+    for name in selected:
+        func = BENCHMARKS[name]()
+        number, timings = time_callable(func, args.warmup, args.repeat, args.min_time)
+        results[name] = {
+            "median_ns": statistics.median(timings),
+            "min_ns": min(timings),
+            "stdev_ns": statistics.stdev(timings) if len(timings) > 1 else 0.0,
+            "number": number,
+            "repeat": args.repeat,
+        }
+        print(f"{name:<45} {results[name]['min_ns']:>10.1f} ns/call")
+
+    report = {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"\nResults written to {args.output}")
+    return 0
+
+
+def compare(args):
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))["results"]
+    current = json.loads(Path(args.current).read_text(encoding="utf-8"))["results"]
+    regressions = []
+    print(f"{'benchmark':<45} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name in sorted(baseline.keys() & current.keys()):
+        # The fastest repetition is the one least disturbed by the rest of the machine
+        before, after = baseline[name]["min_ns"], current[name]["min_ns"]
+        change = (after - before) / before * 100
+        flag = ""
+        if change > args.threshold:
+            regressions.append(name)
+            flag = "  <-- slower"
+        print(f"{name:<45} {before:>10.1f} {after:>10.1f} {change:>+7.1f}%{flag}")
+    for name in sorted(baseline.keys() ^ current.keys()):
+        print(f"{name:<45} only in {'baseline' if name in baseline else 'current'}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) more than {args.threshold}% slower")
+        return 1
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="run the benchmarks")
+    run_parser.add_argument("--output", help="write the results as JSON to this file")
+    run_parser.add_argument("--filter", help="only run benchmarks whose name contains this text")
+    run_parser.add_argument("--warmup", type=int, default=2, help="warmup repetitions (not measured)")
+    run_parser.add_argument("--repeat", type=int, default=7, help="measured repetitions")
+    run_parser.add_argument("--min-time", type=float, default=0.1, help="seconds per repetition")
+    run_parser.set_defaults(handler=run)
+
+    compare_parser = commands.add_parser("compare", help="compare two result files")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="fail when a benchmark is more than this many percent slower")
+    compare_parser.set_defaults(handler=compare)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
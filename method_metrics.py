@@ -0,0 +1,292 @@
+"""Latency histograms for the public methods of the lesson classes, switched on and off at runtime.
+
+MethodMetrics.instrument(cls) only REMEMBERS a class and the methods to time. enable() replaces those
+methods (in the class and in every subclass that overrides them) with a timing wrapper, and disable() puts
+the original functions back. While disabled the classes are exactly the classes of the lessons: a call
+costs the plain method call and nothing else.
+
+Every method gets its own LatencyHistogram, HDR style: the buckets grow with the value, so the same
+small list holds 50ns and 5s with the same RELATIVE precision (1/64 with significant_bits=7),
+and percentiles can be read at any time. The call count is the histogram's count.
+The histograms are exported in the Prometheus text format or as JSON.
+
+Usage:
+    python method_metrics.py dump --format prometheus
+    python method_metrics.py dump --format json --calls 100000
+    python method_metrics.py overhead
+"""
+
+import argparse
+import contextlib
+import functools
+import json
+import sys
+import time
+import types
+
+from benchmark_suite import BENCHMARKS, CHAPTER_2, CHAPTER_4, NullWriter, load_lesson, time_callable
+
+# Prometheus needs the same few buckets for every method, in seconds: the HDR buckets are merged into these
+PROMETHEUS_BUCKETS = (1e-7, 2.5e-7, 5e-7, 1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4,
+                      1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class LatencyHistogram:
+    """Counts of nanosecond values in log-linear buckets.
+    Values below 2**significant_bits have a bucket each. Above that, every power of two is split into
+    2**(significant_bits - 1) equal buckets, so a bucket is never wider than 1/2**(significant_bits - 1) of its values."""
+
+    def __init__(self, significant_bits=7):
+        self.significant_bits = significant_bits
+        self._exact = 1 << significant_bits
+        self._sub_bits = significant_bits - 1
+        self.counts = [0] * (2 * self._exact)  # grows when a slower value arrives, always in place
+        self.record = self._recorder()
+
+    def _recorder(self):
+        """record(value) as a closure over local variables: it runs on every timed call, so it avoids
+        attribute lookups and keeps no separate count or sum (both are derived from the buckets)"""
+        counts, exact, bits, sub_bits = self.counts, self._exact, self.significant_bits, self._sub_bits
+
+        def record(value):
+            if value >= exact:
+                shift = value.bit_length() - bits
+                value = (shift << sub_bits) + (value >> shift)  # from here on: the bucket index
+            try:
+                counts[value] += 1
+            except IndexError:
+                counts.extend([0] * (value + 1 - len(counts)))
+                counts[value] += 1
+
+        return record
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    @property
+    def total(self):
+        """The sum of all values in ns, estimated from the middle of the buckets (like HdrHistogram does)"""
+        return sum((lowest + highest) // 2 * count for lowest, highest, count in self.buckets())
+
+    def bounds(self, index):
+        """The lowest and highest value that land in bucket `index`"""
+        if index < self._exact:
+            return index, index
+        shift = (index >> self._sub_bits) - 1
+        mantissa = index - (shift << self._sub_bits)
+        return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+    def buckets(self):
+        """(lowest, highest, count) of every bucket that has values, from fast to slow"""
+        return [(*self.bounds(index), count) for index, count in enumerate(self.counts) if count]
+
+    def percentile(self, percent):
+        """The highest value of the bucket that holds the given percentile (0 when empty)"""
+        target = max(1, -(-sum(self.counts) * percent // 100))  # rounded up
+        seen = 0
+        for index, count in enumerate(self.counts):
+            seen += count
+            if seen >= target:
+                return self.bounds(index)[1]
+        return 0
+
+    def reset(self):
+        self.counts[:] = [0] * len(self.counts)  # in place: record() holds on to this list
+
+
+class MethodMetrics:
+    def __init__(self, significant_bits=7, clock=time.perf_counter_ns):
+        self.enabled = False
+        self.significant_bits = significant_bits
+        self._clock = clock
+        self._targets = []     # (class, method names) as given to instrument()
+        self._histograms = {}  # (class, method name) -> LatencyHistogram, kept across disable() and enable()
+        self._originals = {}   # (class, method name) -> the function it had before enable()
+
+    def instrument(self, cls, methods=None):
+        """Mark methods of cls for timing (all public ones by default). Costs nothing until enable()."""
+        if methods is None:
+            methods = sorted({name for klass in cls.__mro__[:-1] for name, value in vars(klass).items()
+                              if not name.startswith("_") and isinstance(value, types.FunctionType)})
+        self._targets.append((cls, tuple(methods)))
+        if self.enabled:
+            self._install(cls, methods)
+        return cls
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for cls, methods in self._targets:
+            self._install(cls, methods)
+
+    def disable(self):
+        """Give every class its original methods back. The histograms are kept."""
+        for (cls, name), original in self._originals.items():
+            setattr(cls, name, original)
+        self._originals.clear()
+        self.enabled = False
+
+    def histogram(self, cls, name):
+        return self._histograms.get((cls, name))
+
+    def reset(self):
+        for histogram in self._histograms.values():
+            histogram.reset()
+
+    def _install(self, cls, methods):
+        """Wrap the methods in cls and in every subclass that defines its own version (Circle.calculate_area, ...)"""
+        for klass in _family(cls):
+            for name in methods:
+                method = vars(klass).get(name)
+                if isinstance(method, types.FunctionType) and (klass, name) not in self._originals:
+                    self._originals[klass, name] = method
+                    histogram = self._histograms.get((klass, name))
+                    if histogram is None:
+                        histogram = self._histograms[klass, name] = LatencyHistogram(self.significant_bits)
+                    setattr(klass, name, _timed(method, histogram.record, self._clock))
+
+    # ---------- export ----------
+
+    def _series(self):
+        for (cls, name), histogram in self._histograms.items():
+            if histogram.count:
+                yield {"module": cls.__module__, "class": cls.__qualname__, "method": name}, histogram
+
+    def to_prometheus(self, buckets=PROMETHEUS_BUCKETS, metric="method_latency_seconds"):
+        """The text exposition format: cumulative _bucket{le=...} lines, then _sum and _count (the calls)"""
+        lines = [f"# HELP {metric} Latency of the instrumented methods.", f"# TYPE {metric} histogram"]
+        limits = [round(seconds * 1e9) for seconds in buckets]
+        for labels, histogram in self._series():
+            label_text = ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+            # a bucket is counted under the first limit its highest value fits in: within the HDR precision
+            cumulative = [0] * len(limits)
+            for _, highest, count in histogram.buckets():
+                for i, limit in enumerate(limits):
+                    if highest <= limit:
+                        cumulative[i] += count
+                        break
+            seen = 0
+            for seconds, count in zip(buckets, cumulative):
+                seen += count
+                lines.append(f'{metric}_bucket{{{label_text},le="{seconds:g}"}} {seen}')
+            lines.append(f'{metric}_bucket{{{label_text},le="+Inf"}} {histogram.count}')
+            lines.append(f"{metric}_sum{{{label_text}}} {histogram.total / 1e9:.9f}")
+            lines.append(f"{metric}_count{{{label_text}}} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self, indent=2):
+        """Count, sum and percentiles per method, plus the non-empty HDR buckets as [lowest_ns, highest_ns, count]"""
+        methods = []
+        for labels, histogram in self._series():
+            methods.append({**labels, "calls": histogram.count, "sum_seconds": histogram.total / 1e9,
+                            **{f"p{p:g}_ns".replace(".", "_"): histogram.percentile(p) for p in (50, 90, 99, 99.9)},
+                            "buckets": histogram.buckets()})
+        return json.dumps({"significant_bits": self.significant_bits, "methods": methods}, indent=indent)
+
+
+def _timed(method, record, clock):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        started = clock()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            record(clock() - started)
+
+    return wrapper
+
+
+def _family(cls):
+    """cls and all its subclasses"""
+    family, stack = [], [cls]
+    while stack:
+        klass = stack.pop()
+        family.append(klass)
+        stack.extend(klass.__subclasses__())
+    return family
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def instrument_lessons(metrics: MethodMetrics):
+    """The hot methods of the lessons; the subclasses (EmailService, Circle, Car(Vehicle), ...) are included"""
+    ocp = load_lesson(CHAPTER_4 / "3_Open closed principle.py")
+    metrics.instrument(load_lesson(CHAPTER_2 / "2_Encapsulation.py")["BankAccount"], ["deposit", "withdraw"])
+    metrics.instrument(load_lesson(CHAPTER_2 / "6_coupling.py")["NotificationService"], ["send_notification"])
+    metrics.instrument(ocp.version("Shape", 0), ["calculate_area"])  # the enum based Shape
+    metrics.instrument(ocp["Shape"], ["calculate_area"])             # the abstract Shape
+    metrics.instrument(load_lesson(CHAPTER_2 / "5_polymorphism.py")["Vehicle"], ["start", "stop"])
+    metrics.instrument(load_lesson(CHAPTER_2 / "7_composition.py")["Car"], ["drive"])
+    return metrics
+
+
+def dump(args):
+    metrics = instrument_lessons(MethodMetrics())
+    workloads = [BENCHMARKS[name]() for name in BENCHMARKS]
+    metrics.enable()
+    with contextlib.redirect_stdout(NullWriter()):
+        for _ in range(args.calls):
+            for workload in workloads:
+                workload()
+    metrics.disable()
+    print(metrics.to_prometheus() if args.format == "prometheus" else metrics.to_json())
+    return 0
+
+
+def overhead(args):
+    """ns per call of every benchmark of benchmark_suite.py with the metrics off and on.
+    The modes alternate for a few rounds and the best time of each mode is kept, so a slow moment of the
+    machine does not land on one mode only. The first round runs before enable() was ever called."""
+    metrics = instrument_lessons(MethodMetrics())
+    workloads = {name: BENCHMARKS[name]() for name in BENCHMARKS}
+    originals = {(cls, name): vars(cls)[name] for cls, methods in metrics._targets
+                 for cls in _family(cls) for name in methods if name in vars(cls)}
+    off, on = {}, {}
+
+    def measure(into):
+        for name, workload in workloads.items():
+            timing = min(time_callable(workload, 1, args.repeat, args.min_time)[1])
+            into[name] = min(into.get(name, timing), timing)
+
+    for _ in range(args.rounds):
+        measure(off)
+        metrics.enable()
+        measure(on)
+        metrics.disable()
+    restored = all(vars(cls)[name] is original for (cls, name), original in originals.items())
+    print(f"{'benchmark':<45} {'off':>8} {'on':>8} {'overhead':>9}  (ns per call)")
+    for name in workloads:
+        print(f"{name:<45} {off[name]:>8.1f} {on[name]:>8.1f} {on[name] - off[name]:>+9.1f}")
+    print(f"\nAfter disable() every class holds its original functions again: {restored}")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    dump_parser = commands.add_parser("dump", help="run the benchmark workloads instrumented and print the histograms")
+    dump_parser.add_argument("--format", choices=("prometheus", "json"), default="prometheus")
+    dump_parser.add_argument("--calls", type=int, default=10_000, help="calls of every workload")
+    dump_parser.set_defaults(handler=dump)
+
+    overhead_parser = commands.add_parser("overhead", help="time the workloads with the metrics off and on")
+    overhead_parser.add_argument("--rounds", type=int, default=3, help="times the modes take turns")
+    overhead_parser.add_argument("--repeat", type=int, default=5, help="measured repetitions")
+    overhead_parser.add_argument("--min-time", type=float, default=0.1, help="seconds per repetition")
+    overhead_parser.set_defaults(handler=overhead)
+
+    args = parser.parse_args(argv)
+    return args.handler(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# Measured here (a slow single-core sandbox, where a plain method call is about 100ns): a timed call costs about
+# 400-500ns more, two clock readings and the bucket update. Turned off it costs nothing: the class holds the
+# original function again, which `overhead` checks. Calls from several threads may rarely lose a count (no lock).